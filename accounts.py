@@ -0,0 +1,138 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from binledger import BinaryAccountFile
+from ledger import pin_store, unpin_store
+from persistence import account_file, release_account_file
+
+DEFAULT_ACCOUNT_ID = "default"
+# Accounts other than the default one live in ACCOUNTS_DIR/<account_id>.json
+# and start out empty; an <account_id>.bin binary ledger there (with no .json
+# beside it) is served read-only, straight from its memory-mapped columns
+ACCOUNTS_DIR = "accounts"
+EMPTY_ACCOUNT = {"balance": 0.0, "transactions": []}
+# Estimated resident memory allowed for loaded accounts before LRU eviction
+MEMORY_BUDGET = 512 * 1024 * 1024
+# Rough resident cost of one transaction: its dict and strings plus the columns
+TRANSACTION_BYTES = 600
+ACCOUNT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+# Estimated resident memory of a loaded account
+def estimate_account_bytes(account):
+    return 1024 + TRANSACTION_BYTES * len(account["transactions"])
+
+
+class _Entry:
+    def __init__(self, account, handle):
+        self.account = account
+        self.transactions = account["transactions"]
+        self.handle = handle
+        self.size = estimate_account_bytes(account)
+
+
+# Many accounts held in one process, loaded on first use and evicted
+# least-recently-used first once their estimated size exceeds the budget
+# Loading, saving and eviction are serialized by one registry lock; callers
+# that read and then modify an account hold lock(account_id) around the turn.
+# A file changed by someone else (different mtime/size) is reloaded on the next
+# get(); the version on disk wins over unsaved changes in memory.
+class AccountRegistry:
+    def __init__(self, default_path, default_account=None, accounts_dir=ACCOUNTS_DIR, memory_budget=MEMORY_BUDGET):
+        self.default_path = default_path
+        self.default_account = default_account
+        self.accounts_dir = accounts_dir
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._account_locks = {}
+
+    def __contains__(self, account_id):
+        return account_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def path_for(self, account_id):
+        if account_id == DEFAULT_ACCOUNT_ID:
+            return self.default_path
+        if not ACCOUNT_ID_PATTERN.match(account_id):
+            raise ValueError(f"Invalid account id: {account_id!r}")
+        path = os.path.join(self.accounts_dir, f"{account_id}.json")
+        binary_path = os.path.join(self.accounts_dir, f"{account_id}.bin")
+        if not os.path.exists(path) and os.path.exists(binary_path):
+            return binary_path
+        return path
+
+    # Lock held by a session while it answers or modifies one account
+    def lock(self, account_id):
+        with self._lock:
+            lock = self._account_locks.get(account_id)
+            if lock is None:
+                lock = self._account_locks[account_id] = threading.RLock()
+            return lock
+
+    # Get an account, loading it (and evicting others) if needed
+    def get(self, account_id):
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is not None and entry.handle.changed_on_disk():
+                self._drop(account_id)
+                entry = None
+            if entry is None:
+                template = self.default_account if account_id == DEFAULT_ACCOUNT_ID else EMPTY_ACCOUNT
+                path = self.path_for(account_id)
+                if path.endswith(".bin"):
+                    handle = BinaryAccountFile(path)
+                else:
+                    handle = account_file(path, template)
+                entry = _Entry(handle.load(), handle)
+                pin_store(entry.account["transactions"])
+                self._entries[account_id] = entry
+                self._evict_over_budget(keep=account_id)
+            else:
+                self._entries.move_to_end(account_id)
+                entry.size = estimate_account_bytes(entry.account)
+            return entry.account
+
+    # Persist an account's pending changes (no-op if unchanged or not loaded)
+    def save(self, account_id):
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is None:
+                return False
+            return entry.handle.save(entry.account)
+
+    def save_all(self):
+        with self._lock:
+            for account_id in list(self._entries):
+                self.save(account_id)
+
+    # Drop an account from memory, saving it first
+    def evict(self, account_id):
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is None:
+                return
+            entry.handle.save(entry.account)
+            self._drop(account_id)
+
+    def _drop(self, account_id):
+        entry = self._entries.pop(account_id)
+        unpin_store(entry.transactions)
+        if isinstance(entry.handle, BinaryAccountFile):
+            entry.handle.close()
+        else:
+            release_account_file(entry.handle.path)
+
+    def memory_usage(self):
+        return sum(entry.size for entry in self._entries.values())
+
+    def _evict_over_budget(self, keep):
+        while self.memory_usage() > self.memory_budget:
+            victim = next((account_id for account_id in self._entries if account_id != keep), None)
+            if victim is None:
+                break
+            self.evict(victim)
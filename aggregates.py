@@ -0,0 +1,122 @@
+import heapq
+from collections import Counter
+from datetime import date
+
+
+# Month bucket key for a day ordinal: (year, month)
+def month_of(day):
+    d = date.fromordinal(day)
+    return d.year, d.month
+
+
+# Running totals kept beside a TransactionStore and updated in O(1) per row
+# All amounts are integer cents; spend is kept as a positive number.
+class LedgerAggregates:
+    def __init__(self):
+        self.total_income = 0
+        self.total_spent = 0
+        self.by_category = {}  # category -> [income, spend]
+        self.by_month = {}  # (year, month) -> [income, spend]
+        # Min-heap of (cents, serial) for expenses; removed rows are skipped lazily
+        self._expenses = []
+        self._removed = Counter()
+        self._months = {}  # day ordinal -> (year, month), dates repeat heavily
+
+    def _month(self, day):
+        key = self._months.get(day)
+        if key is None:
+            key = self._months[day] = month_of(day)
+        return key
+
+    def _apply(self, day, cents, category, sign):
+        income = cents * sign if cents > 0 else 0
+        spend = -cents * sign if cents < 0 else 0
+        self.total_income += income
+        self.total_spent += spend
+        bucket = self.by_category.get(category)
+        if bucket is None:
+            bucket = self.by_category[category] = [0, 0]
+        bucket[0] += income
+        bucket[1] += spend
+        if day:  # day 0 marks an unparsable date
+            bucket = self.by_month.get(self._month(day))
+            if bucket is None:
+                bucket = self.by_month[self._month(day)] = [0, 0]
+            bucket[0] += income
+            bucket[1] += spend
+
+    def add(self, serial, day, cents, category):
+        self._apply(day, cents, category, 1)
+        if cents < 0:
+            heapq.heappush(self._expenses, (cents, serial))
+
+    def remove(self, serial, day, cents, category):
+        self._apply(day, cents, category, -1)
+        if cents < 0:
+            self._removed[(cents, serial)] += 1
+
+    def spending_by_category(self, category):
+        bucket = self.by_category.get(category)
+        return bucket[1] if bucket else 0
+
+    # Income for every category whose name matches case-insensitively
+    def income_by_category_like(self, category_name):
+        name = category_name.lower()
+        return sum(bucket[0] for category, bucket in self.by_category.items() if category.lower() == name)
+
+    def month_totals(self, year, month):
+        bucket = self.by_month.get((year, month))
+        return (bucket[0], bucket[1]) if bucket else (0, 0)
+
+    # Serial of the largest expense (earliest row on ties), or None
+    def largest_expense_serial(self):
+        heap = self._expenses
+        while heap and self._removed[heap[0]]:
+            self._removed[heap[0]] -= 1
+            if not self._removed[heap[0]]:
+                del self._removed[heap[0]]
+            heapq.heappop(heap)
+        return heap[0][1] if heap else None
+
+    # Aggregates of a ledger whose totals were computed elsewhere (a binary ledger file)
+    # largest_expense is (cents, serial) of the largest expense, or None.
+    @classmethod
+    def from_totals(cls, by_category, by_month, largest_expense=None):
+        aggregates = cls()
+        aggregates.by_category = by_category
+        aggregates.by_month = by_month
+        aggregates.total_income = sum(bucket[0] for bucket in by_category.values())
+        aggregates.total_spent = sum(bucket[1] for bucket in by_category.values())
+        if largest_expense is not None:
+            aggregates._expenses.append(largest_expense)
+        return aggregates
+
+    @classmethod
+    def from_store(cls, store):
+        aggregates = cls()
+        categories = store.categories.values
+        for serial, day, cents, code in zip(store.serials, store.days, store.cents, store.category_codes):
+            aggregates.add(serial, day, cents, categories[code])
+        return aggregates
+
+    # Compare against a full recompute from the store's columns
+    # Returns the names of the aggregates that disagree (empty when consistent).
+    def verify(self, store):
+        expected = LedgerAggregates.from_store(store)
+        mismatches = []
+        if self.total_income != store.total_income_cents():
+            mismatches.append("total_income")
+        if self.total_spent != store.total_spent_cents():
+            mismatches.append("total_spent")
+        if _nonzero(self.by_category) != _nonzero(expected.by_category):
+            mismatches.append("by_category")
+        if _nonzero(self.by_month) != _nonzero(expected.by_month):
+            mismatches.append("by_month")
+        if self.largest_expense_serial() != expected.largest_expense_serial():
+            mismatches.append("largest_expense")
+        return mismatches
+
+
+# Drop buckets that were emptied by removals before comparing
+def _nonzero(buckets):
+    return {key: tuple(bucket) for key, bucket in buckets.items() if any(bucket)}
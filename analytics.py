@@ -0,0 +1,131 @@
+import calendar
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from weakref import WeakKeyDictionary
+
+from ledger import INVALID_DAY, store_for
+
+# Key of the all-categories series
+ALL = None
+
+
+# Running total of one series over the days it has amounts on: days is
+# ascending and sums[i] is the total on days[:i], so the total on any window
+# is two bisects and a subtraction. Sparse, so far-apart dates cost nothing.
+class DaySums:
+    def __init__(self):
+        self.days = array("i")
+        self.sums = array("q", [0])
+
+    # Add an amount on a day not earlier than the last one added
+    def add(self, day, cents):
+        if self.days and self.days[-1] == day:
+            self.sums[-1] += cents
+        else:
+            self.days.append(day)
+            self.sums.append(self.sums[-1] + cents)
+
+    def between(self, start_day, end_day):
+        lo, hi = bisect_left(self.days, start_day), bisect_right(self.days, end_day)
+        return self.sums[hi] - self.sums[lo] if lo < hi else 0
+
+
+# Per-category daily spend and income of a column store, as DaySums per
+# category (keyed lower-case) plus ALL
+# Built in date order from the store's date index; rows appended later on or
+# after the last day are added in place (see update()), anything else rebuilds.
+class DailySeries:
+    def __init__(self, store):
+        self.spend = {ALL: DaySums()}
+        self.income = {ALL: DaySums()}
+        self.start = self.end = None
+        self.rows = 0
+        self.last_serial = None
+        self.version = store.version
+        index = store.date_index
+        days, cents, codes = store.days, store.cents, store.category_codes
+        categories = store.categories.values
+        for row in index.rows:
+            self._add(days[row], cents[row], categories[codes[row]])
+        self._seen(store)
+
+    def _add(self, day, cents, category):
+        if not cents:
+            return
+        if self.start is None:
+            self.start = day
+        self.end = day
+        series = self.spend if cents < 0 else self.income
+        category = category.lower()
+        sums = series.get(category)
+        if sums is None:
+            sums = series[category] = DaySums()
+        sums.add(day, abs(cents))
+        series[ALL].add(day, abs(cents))
+
+    def _seen(self, store):
+        self.rows = len(store)
+        self.last_serial = store.serials[-1] if self.rows else None
+        self.version = store.version
+
+    # Catch up with a store that has only had rows appended, each dated on or
+    # after the latest day so far; returns False if it must be rebuilt instead
+    def update(self, store):
+        if store.version == self.version:
+            return True
+        if len(store) < self.rows or (self.rows and store.serials[self.rows - 1] != self.last_serial):
+            return False
+        latest = self.end
+        for day in store.days[self.rows:]:
+            if day == INVALID_DAY or (latest is not None and day < latest):
+                return False
+            latest = day
+        categories = store.categories.values
+        for row in range(self.rows, len(store)):
+            self._add(store.days[row], store.cents[row], categories[store.category_codes[row]])
+        self._seen(store)
+        return True
+
+    @property
+    def first_day(self):
+        return date.fromordinal(self.start) if self.start is not None else None
+
+    # Spend in cents on days start..end (dates, inclusive), optionally for one category
+    def spending_between(self, start, end, category=ALL):
+        sums = self.spend.get(category)
+        return sums.between(start.toordinal(), end.toordinal()) if sums else 0
+
+    def income_between(self, start, end, category=ALL):
+        sums = self.income.get(category)
+        return sums.between(start.toordinal(), end.toordinal()) if sums else 0
+
+    # Spend in cents for each (start, end) period
+    def spending_by_period(self, periods, category=ALL):
+        return [self.spending_between(start, end, category) for start, end in periods]
+
+    # Total spend of the `days`-day windows ending on each of the given dates
+    def rolling_spending(self, days, ends, category=ALL):
+        return [self.spending_between(end - timedelta(days=days - 1), end, category) for end in ends]
+
+
+# First and last day of a calendar month
+def month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+# Months from January up to and including the given date's month
+def months_to_date(today):
+    return tuple(month_bounds(today.year, month) for month in range(1, today.month + 1))
+
+
+_series = WeakKeyDictionary()  # store -> DailySeries
+
+
+# Daily series of a transactions list, kept in step with its ledger version
+def series_for(transactions):
+    store = store_for(transactions)
+    series = _series.get(store)
+    if series is None or not series.update(store):
+        series = _series[store] = DailySeries(store)
+    return series
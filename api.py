@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+import traceback
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import chat
+from accounts import DEFAULT_ACCOUNT_ID
+from ledger import store_for
+from metrics import metrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+# Largest request body the HTTP server accepts
+MAX_BODY_BYTES = 1024 * 1024
+
+
+# Answer many queries against one snapshot of an account
+# Every query is routed first; cacheable queries that resolve to the same
+# intent, slots and date window share one answer, computed once through the
+# response cache. Stateful intents ("show more") are answered per query, in
+# input order.
+# With a lock (e.g. registry.lock(account_id)) nothing can append to the ledger
+# while the batch runs; the balance is captured once either way.
+def answer_many(queries, account=None, lock=None):
+    if account is None:
+        account = chat.default_account()
+    with lock or nullcontext():
+        snapshot = {"balance": account["balance"], "transactions": account["transactions"]}
+        # "show more" pages on from lists shown earlier in the same batch only
+        context = {"account": snapshot, "session": {}}
+        with metrics.span("index"):
+            version = store_for(snapshot["transactions"]).version
+
+        with metrics.span("route"):
+            resolved = {text: chat.router.resolve(text) for text in dict.fromkeys(queries)}
+
+        # Cacheable answers depend only on the ledger, so equal (intent, slots)
+        # share one; the others ("show more") run once per query, in order
+        results = []
+        shared = {}
+        with metrics.span("answer"):
+            for text in queries:
+                intent, slots = resolved[text]
+                metrics.observe_intent(intent.name)
+                if not intent.cacheable:
+                    results.append(intent.answer(slots, context))
+                    continue
+                key = (intent.name, tuple(sorted(slots.items())))
+                if key not in shared:
+                    shared[key] = chat.response_cache.get_or_compute(
+                        (*key, version), lambda: intent.answer(slots, context)
+                    )
+                results.append(shared[key])
+    return results
+
+
+# asyncio-friendly answer_many(): runs the batch in a worker thread
+async def answer_many_async(queries, account=None, lock=None):
+    return await asyncio.to_thread(answer_many, queries, account, lock)
+
+
+# Answer a batch for an account held by the shared registry (chat.registry)
+def answer_for_account(account_id, queries):
+    lock = chat.registry.lock(account_id)
+    with lock:
+        account = chat.registry.get(account_id)
+        return answer_many(queries, account, lock)
+
+
+# Local HTTP stand-in for load testing
+#   POST /query    {"account": "alice", "queries": ["What's my balance?", ...]}
+#                  -> {"answers": ["Your balance is $0.00.", ...]}
+#   GET  /metrics  Prometheus text (run with FINCHAT_METRICS=1)
+#   GET  /health   "ok"
+class QueryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+        elif path == "/health":
+            self._send(200, "ok", "text/plain")
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/query":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            queries = body["queries"]
+            if isinstance(queries, str):
+                queries = [queries]
+            if not all(isinstance(q, str) for q in queries):
+                raise ValueError("queries must be strings")
+            answers = answer_for_account(body.get("account", DEFAULT_ACCOUNT_ID), queries)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception:
+            # A failing handler must not drop the connection without a response
+            traceback.print_exc()
+            self._send_json(500, {"error": "internal error"})
+            return
+        self._send_json(200, {"answers": answers})
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data), "application/json")
+
+    def _send(self, status, text, content_type):
+        payload = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Keep load tests quiet
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return ThreadingHTTPServer((host, port), QueryHandler)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Serve FinChat queries over HTTP (local stand-in).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port)
+    print(f"Serving FinChat on http://{args.host}:{server.server_port} (POST /query, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main_cli()
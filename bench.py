@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+import chat
+from categorizer import Categorizer, Rule
+from ledger import TransactionStore, store_for, money
+from persistence import AccountFile
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_SEED = 42
+# Days of history in a synthetic ledger, ending today
+HISTORY_DAYS = 730
+# Each measurement runs at least MIN_RUNS times and until MIN_SECONDS have passed
+MIN_RUNS = 5
+MAX_RUNS = 200
+MIN_SECONDS = 0.2
+# A p50 slower than the baseline by more than this fraction is a regression
+REGRESSION_THRESHOLD = 0.25
+# Keyword rules in the large categorizer benchmark
+LARGE_RULE_SET = 1_000
+
+# Spending categories: (weight, typical amount, merchants)
+SPENDING_PROFILE = {
+    "food": (40, 18.0, ("Coffee Shop", "Grocery Store", "Restaurant", "Bakery", "Pizza Place", "Deli")),
+    "transport": (18, 14.0, ("Bus Ticket", "Uber", "Train Pass", "Fuel Station", "Parking")),
+    "shopping": (12, 45.0, ("Amazon", "Department Store", "Hardware Store", "Bookshop")),
+    "entertainment": (8, 25.0, ("Cinema", "Netflix", "Concert Hall", "Spotify")),
+    "utilities": (5, 80.0, ("Electric Company", "Water Bill", "Internet Provider")),
+    "health": (4, 60.0, ("Pharmacy", "Dentist", "Gym Membership")),
+    "education": (3, 90.0, ("Books", "Online Course")),
+}
+# Income categories: (weight, typical amount, merchants)
+INCOME_PROFILE = {
+    "salary": (6, 2500.0, ("Salary Deposit",)),
+    "freelance": (3, 400.0, ("Freelance Payment", "Consulting Invoice")),
+    "refund": (1, 30.0, ("Store Refund",)),
+}
+
+# One sample query per process_query intent
+BENCH_QUERIES = {
+    "balance": "What's my balance?",
+    "history": "Show transactions",
+    "history_income": "Show my income transactions",
+    "history_more": "Show more",
+    "merchant_history": "Show transactions from Uber",
+    "spent_at": "How much did I spend at Coffee Shop?",
+    "total_spent": "How much have I spent in total?",
+    "total_income": "How much income did I receive in total?",
+    "spend_on_food": "How much did I spend on food?",
+    "spend_on_transport": "How much did I spend on transport?",
+    "income_from": "How much income from salary?",
+    "income_last_month": "What was my income last month?",
+    "largest_expense": "What's my biggest expense?",
+    "spend_last_week": "How much did I spend last week?",
+    "spend_in_month": "What were my expenses in April?",
+    "spend_per_month": "Spending on food per month this year",
+    "compare_months": "Compare March vs April",
+    "rolling_spend": "30-day rolling spend",
+    "average_weekly": "Average weekly transport",
+    "fallback": "Tell me a joke",
+}
+
+
+# Seeded synthetic ledger in the account.json schema, in date order
+# Categories are drawn by weight, amounts are log-normal around each category's
+# typical amount and dates are spread uniformly over the last `days` days.
+def generate_ledger(n, seed=DEFAULT_SEED, end=None, days=HISTORY_DAYS):
+    rng = random.Random(seed)
+    end = end or date.today()
+    start_ordinal = (end - timedelta(days=days - 1)).toordinal()
+    categories = list(SPENDING_PROFILE) + list(INCOME_PROFILE)
+    profiles = {**SPENDING_PROFILE, **INCOME_PROFILE}
+    weights = [profiles[c][0] for c in categories]
+
+    ordinals = sorted(start_ordinal + rng.randrange(days) for _ in range(n))
+    dates = {}
+    transactions = []
+    for ordinal, category in zip(ordinals, rng.choices(categories, weights, k=n)):
+        _, typical, merchants = profiles[category]
+        amount = round(rng.lognormvariate(0, 0.6) * typical, 2) or 0.01
+        if category in SPENDING_PROFILE:
+            amount = -amount
+        day = dates.get(ordinal)
+        if day is None:
+            day = dates[ordinal] = date.fromordinal(ordinal).isoformat()
+        transactions.append({
+            "date": day,
+            "amount": amount,
+            "description": rng.choice(merchants),
+            "category": category,
+        })
+    balance = round(1000.0 + sum(t["amount"] for t in transactions), 2)
+    return {"balance": balance, "transactions": transactions}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Time fn() repeatedly; "setup" runs untimed before every call
+def measure(fn, setup=None):
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MIN_RUNS or (len(samples) < MAX_RUNS and time.perf_counter() - started < MIN_SECONDS):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    return summarize(samples)
+
+
+def summarize(samples):
+    mean = sum(samples) / len(samples)
+    return {
+        "runs": len(samples),
+        "p50_us": round(percentile(samples, 0.50) / 1000, 3),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 3),
+        "ops_per_sec": round(1e9 / mean, 1) if mean else None,
+    }
+
+
+# Peak traced allocation while running fn() once
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_queries(account):
+    results = {}
+    for name, query in BENCH_QUERIES.items():
+        # Uncached: the answer is recomputed from the (warm) store every time
+        results[f"query:{name}"] = measure(
+            lambda: chat.process_query(query, account), setup=chat.response_cache.clear
+        )
+    results["query:cached"] = measure(lambda: chat.process_query(BENCH_QUERIES["spend_on_food"], account))
+    return results
+
+
+def bench_helpers(account):
+    transactions = account["transactions"]
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    helpers = {
+        "get_spending_by_category": lambda: chat.get_spending_by_category("food", account),
+        "get_income_by_category": lambda: chat.get_income_by_category("salary", account),
+        "get_total_income": lambda: chat.get_total_income(transactions),
+        "get_total_spent": lambda: chat.get_total_spent(transactions),
+        "get_largest_transaction": lambda: chat.get_largest_transaction(account),
+        "get_spending_by_date_range": lambda: chat.get_spending_by_date_range(transactions, month_ago, today),
+        "get_income_by_date_range": lambda: chat.get_income_by_date_range(transactions, month_ago, today),
+    }
+    return {f"helper:{name}": measure(fn) for name, fn in helpers.items()}
+
+
+# Total spend four ways: float amounts rounded at the end (the old helpers),
+# exact Decimal arithmetic, a full pass over the integer-cent column, and the
+# integer running total the queries read (exact, so it can be kept up to date
+# per row without drifting). Also records how far the unrounded float sum
+# drifts from the exact total.
+def bench_money(account):
+    transactions = account["transactions"]
+    store = store_for(transactions)
+    exact = store.total_spent_cents()
+    float_total = -sum(t["amount"] for t in transactions if t["amount"] < 0)
+    return {
+        "money:float_spent": measure(lambda: round(-sum(t["amount"] for t in transactions if t["amount"] < 0), 2)),
+        "money:decimal_spent": measure(
+            lambda: -sum(Decimal(repr(t["amount"])) for t in transactions if t["amount"] < 0)
+        ),
+        "money:cents_column_spent": measure(store.total_spent_cents),
+        "money:cents_running_spent": measure(lambda: store.aggregates.total_spent),
+        "money:float_drift_cents": float(abs(Decimal(float_total) - money(exact)) * 100),
+    }
+
+
+# Categorizing every row with the default rules and with LARGE_RULE_SET
+# keyword rules; descriptions carry a reference number, as bank exports do,
+# so each one is new to the categorizer's per-description cache
+def bench_categorize(account):
+    rows = [
+        {"description": f"{t['description']} STORE {i % 1500} REF{i:09d}", "amount": t["amount"], "category": ""}
+        for i, t in enumerate(account["transactions"])
+    ]
+    large = [Rule(f"rule{i}", keywords=(f"merchant{i}", f"store {i}")) for i in range(LARGE_RULE_SET)]
+    return {
+        "categorize:default_rules": measure(lambda: Categorizer().categorize_batch(rows, overwrite=True)),
+        "categorize:large_rule_set": measure(lambda: Categorizer(large).categorize_batch(rows, overwrite=True)),
+    }
+
+
+def bench_storage(account, tmpdir):
+    path = os.path.join(tmpdir, "account.json")
+    handle = AccountFile(path)
+    handle.write_snapshot(account)
+    row = dict(account["transactions"][-1])
+
+    def append_and_save():
+        loaded["transactions"].append(row)
+        handle.save(loaded)
+
+    loaded = handle.load()
+    return {
+        "storage:load_account": measure(lambda: AccountFile(path).load()),
+        "storage:save_unchanged": measure(lambda: handle.save(loaded)),
+        "storage:save_append": measure(append_and_save),
+        "storage:save_snapshot": measure(lambda: handle.write_snapshot(loaded)),
+        "storage:build_store": measure(lambda: TransactionStore.from_transactions(account["transactions"])),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, seed=DEFAULT_SEED):
+    covered = {chat.router.route(query.strip().lower()).name for query in BENCH_QUERIES.values()}
+    uncovered = {intent.name for intent in chat.router.intents} - covered
+    if uncovered:
+        print(f"Warning: no benchmark query for intents: {', '.join(sorted(uncovered))}")
+
+    report = {
+        "meta": {
+            "seed": seed,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for n in sizes:
+        print(f"Benchmarking {n} transactions...")
+        account = generate_ledger(n, seed)
+        results = {}
+        results["memory:generate_peak_bytes"] = peak_memory(lambda: generate_ledger(n, seed))
+        results["memory:store_peak_bytes"] = peak_memory(lambda: TransactionStore.from_transactions(account["transactions"]))
+        store_for(account["transactions"])  # warm the store the queries will use
+        results.update(bench_queries(account))
+        results.update(bench_helpers(account))
+        results.update(bench_money(account))
+        results.update(bench_categorize(account))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results.update(bench_storage(account, tmpdir))
+        report["results"][str(n)] = results
+    return report
+
+
+# Compare two reports; returns the measurements whose p50 regressed
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for size, results in current["results"].items():
+        for name, result in results.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if not isinstance(result, dict) or not isinstance(before, dict) or not before["p50_us"]:
+                continue
+            ratio = result["p50_us"] / before["p50_us"]
+            if ratio > 1 + threshold:
+                regressions.append((size, name, before["p50_us"], result["p50_us"], ratio))
+    return regressions
+
+
+def print_report(report):
+    for size, results in report["results"].items():
+        print(f"\n{size} transactions")
+        for name, result in results.items():
+            if isinstance(result, dict):
+                print(f"  {name:40} p50 {result['p50_us']:>12.1f}us  p99 {result['p99_us']:>12.1f}us  "
+                      f"{result['ops_per_sec']:>12.1f} ops/s")
+            elif name.startswith("memory:"):
+                print(f"  {name:40} {result / 1024 / 1024:>12.1f} MiB")
+            else:
+                print(f"  {name:40} {result:>12.6g}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FinChat queries, helpers and storage.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated ledger sizes (1000 to 10000000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON report")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run([int(size) for size in args.sizes.split(",")], args.seed)
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for size, name, before, after, ratio in regressions:
+            print(f"REGRESSION {size} {name}: p50 {before:.1f}us -> {after:.1f}us ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,396 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date
+
+from aggregates import LedgerAggregates, month_of
+from ledger import TransactionStore, DateIndex, StringTable, INVALID_DAY, to_cents, from_cents
+from search import DescriptionIndex
+
+# Compact fixed-width ledger file, opened with mmap so queries only touch the
+# pages they read. Layout (little-endian):
+#   header: magic, version, row count, balance cents, largest expense row,
+#           then (offset, size) for every section below
+#   days                int32[n]   day ordinal per row
+#   cents               int64[n]   amount in cents per row
+#   category_ids        int32[n]   index into the categories list
+#   description_offsets uint32[n]  offset of the row's description in strings
+#   sorted_days         int32[n]   days in ascending order
+#   sorted_rows         uint32[n]  row index for each sorted_days entry
+#   income_prefix       int64[n+1] prefix sums of income over sorted rows
+#   spend_prefix        int64[n+1] prefix sums of spend over sorted rows
+#   category_totals     int64[2c]  income, spend per category
+#   strings             uint32 length + UTF-8 bytes per distinct description
+#   categories          UTF-8 JSON list of category names
+MAGIC = b"FINLEDG\x01"
+VERSION = 1
+SECTIONS = (
+    "days", "cents", "category_ids", "description_offsets", "sorted_days", "sorted_rows",
+    "income_prefix", "spend_prefix", "category_totals", "strings", "categories",
+)
+TYPECODES = {
+    "days": "i", "cents": "q", "category_ids": "i", "description_offsets": "I",
+    "sorted_days": "i", "sorted_rows": "I", "income_prefix": "q", "spend_prefix": "q",
+    "category_totals": "q",
+}
+HEADER = struct.Struct("<8sIQqq" + "QQ" * len(SECTIONS))
+STRING_LENGTH = struct.Struct("<I")
+ALIGNMENT = 8
+
+
+def _check_byteorder():
+    if sys.byteorder != "little":
+        raise OSError("Binary ledgers are only supported on little-endian machines")
+
+
+# Write an account (in the account.json schema) as a binary ledger, atomically
+def write_ledger(account, path):
+    _check_byteorder()
+    store = TransactionStore.from_account(account)
+    if INVALID_DAY in store.days:
+        raise ValueError("Binary ledgers need a valid YYYY-MM-DD date on every transaction")
+
+    strings = bytearray()
+    string_offsets = array("I")
+    for value in store.descriptions.values:
+        data = value.encode("utf-8")
+        string_offsets.append(len(strings))
+        strings += STRING_LENGTH.pack(len(data))
+        strings += data
+
+    index = DateIndex(store)
+    totals = array("q")
+    for category in store.categories.values:
+        totals.extend(store.aggregates.by_category[category])
+    largest = store.largest_expense_index()
+
+    sections = {
+        "days": store.days.tobytes(),
+        "cents": store.cents.tobytes(),
+        "category_ids": store.category_codes.tobytes(),
+        "description_offsets": array("I", map(string_offsets.__getitem__, store.description_codes)).tobytes(),
+        "sorted_days": index.days.tobytes(),
+        "sorted_rows": array("I", index.rows).tobytes(),
+        "income_prefix": index.income_prefix.tobytes(),
+        "spend_prefix": index.spend_prefix.tobytes(),
+        "category_totals": totals.tobytes(),
+        "strings": bytes(strings),
+        "categories": json.dumps(store.categories.values).encode("utf-8"),
+    }
+
+    table = []
+    offset = HEADER.size
+    for name in SECTIONS:
+        offset += -offset % ALIGNMENT
+        table += [offset, len(sections[name])]
+        offset += len(sections[name])
+    header = HEADER.pack(
+        MAGIC, VERSION, len(store), to_cents(account["balance"]), -1 if largest is None else largest, *table
+    )
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for name in SECTIONS:
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            f.write(sections[name])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# Read-only, memory-mapped view of a binary ledger
+# Columns are zero-copy memoryviews; nothing is decoded until it is asked for.
+class BinaryLedger:
+    def __init__(self, path):
+        _check_byteorder()
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        fields = HEADER.unpack_from(self._mmap)
+        magic, version, self.count, self.balance_cents, self._largest = fields[:5]
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} binary ledger")
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        table = fields[5:]
+        for i, name in enumerate(SECTIONS):
+            start, size = table[2 * i], table[2 * i + 1]
+            view = buffer[start:start + size]
+            if name in TYPECODES:
+                view = view.cast(TYPECODES[name])
+            self._views.append(view)
+            setattr(self, name, view)
+        self.categories = json.loads(bytes(self.categories))
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def balance(self):
+        return from_cents(self.balance_cents)
+
+    def description(self, offset):
+        (length,) = STRING_LENGTH.unpack_from(self.strings, offset)
+        start = offset + STRING_LENGTH.size
+        return bytes(self.strings[start:start + length]).decode("utf-8")
+
+    # Distinct descriptions in file order, and the index of each by its offset
+    def description_table(self):
+        values, codes = [], {}
+        offset = 0
+        while offset < len(self.strings):
+            codes[offset] = len(values)
+            values.append(self.description(offset))
+            offset += STRING_LENGTH.size + STRING_LENGTH.unpack_from(self.strings, offset)[0]
+        return values, codes
+
+    def row(self, i):
+        return {
+            "date": date.fromordinal(self.days[i]).isoformat(),
+            "amount": from_cents(self.cents[i]),
+            "description": self.description(self.description_offsets[i]),
+            "category": self.categories[self.category_ids[i]],
+        }
+
+    def transactions(self):
+        return BinaryTransactions(self)
+
+    def to_store(self):
+        return BinaryStore(self)
+
+    # Materialize the whole ledger in the account.json schema
+    def to_account(self):
+        return {"balance": self.balance, "transactions": [self.row(i) for i in range(self.count)]}
+
+    def total_income_cents(self):
+        return self.income_prefix[-1]
+
+    def total_spent_cents(self):
+        return self.spend_prefix[-1]
+
+    def spending_by_category_cents(self, category):
+        if category not in self.categories:
+            return 0
+        return self.category_totals[2 * self.categories.index(category) + 1]
+
+    def income_by_category_cents(self, category_name):
+        name = category_name.lower()
+        return sum(
+            self.category_totals[2 * code] for code, value in enumerate(self.categories) if value.lower() == name
+        )
+
+    def income_between_cents(self, start_date, end_date):
+        lo, hi = self._bounds(start_date, end_date)
+        return self.income_prefix[hi] - self.income_prefix[lo] if lo < hi else 0
+
+    def spending_between_cents(self, start_date, end_date):
+        lo, hi = self._bounds(start_date, end_date)
+        return self.spend_prefix[hi] - self.spend_prefix[lo] if lo < hi else 0
+
+    # Binary search over sorted_days only touches O(log n) pages
+    def _bounds(self, start_date, end_date):
+        return (
+            bisect_left(self.sorted_days, start_date.toordinal()),
+            bisect_right(self.sorted_days, end_date.toordinal()),
+        )
+
+    def largest_expense_index(self):
+        return None if self._largest < 0 else self._largest
+
+
+# Lazy, read-only list of transaction dicts backed by a BinaryLedger
+class BinaryTransactions(Sequence):
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def __len__(self):
+        return len(self.ledger)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.ledger.row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("transaction index out of range")
+        return self.ledger.row(i)
+
+    # store_for() builds the column store from the ledger's sections, not from rows
+    def to_store(self):
+        return self.ledger.to_store()
+
+
+# Copy a typed section out of the mapping into an array of the same type
+def _copy_column(typecode, view):
+    column = array(typecode)
+    with view.cast("B") as raw:
+        column.frombytes(raw)
+    return column
+
+
+# Column store of a BinaryLedger, built from its sections without a dict per row
+# Columns are copied out in bulk, the date index and aggregates come from the
+# stored prefix sums and category totals, and the description index is only
+# built when a query first searches. Read-only: nothing appends to it.
+class BinaryStore(TransactionStore):
+    def __init__(self, ledger):
+        super().__init__()
+        self._search = None
+        count = len(ledger)
+        self.days = _copy_column("i", ledger.days)
+        self.cents = _copy_column("q", ledger.cents)
+        self.category_codes = _copy_column("i", ledger.category_ids)
+        self.serials = array("q", range(count))
+        self._next_serial = count
+        self.categories = StringTable.from_values(ledger.categories)
+        descriptions, codes = ledger.description_table()
+        self.descriptions = StringTable.from_values(descriptions)
+        self.description_codes = array("i", map(codes.__getitem__, ledger.description_offsets))
+
+        index = DateIndex.from_columns(
+            array("q", ledger.sorted_rows),
+            _copy_column("i", ledger.sorted_days),
+            _copy_column("q", ledger.income_prefix),
+            _copy_column("q", ledger.spend_prefix),
+        )
+        self._date_index = index
+        days = list(dict.fromkeys(index.days))
+        self._date_days = array("i", days)
+        self.dates = StringTable.from_values(date.fromordinal(day).isoformat() for day in days)
+        day_codes = {day: code for code, day in enumerate(days)}
+        self.date_codes = array("i", map(day_codes.__getitem__, self.days))
+
+        by_category = {
+            category: [ledger.category_totals[2 * code], ledger.category_totals[2 * code + 1]]
+            for code, category in enumerate(ledger.categories)
+        }
+        by_month = {}
+        for year, month in dict.fromkeys(map(month_of, days)):
+            start = date(year, month, 1).toordinal()
+            end = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)).toordinal() - 1
+            by_month[(year, month)] = [index.income_between_cents(start, end), index.spending_between_cents(start, end)]
+        largest = ledger.largest_expense_index()
+        self.aggregates = LedgerAggregates.from_totals(
+            by_category, by_month, None if largest is None else (self.cents[largest], largest)
+        )
+
+    @property
+    def search(self):
+        if self._search is None:
+            search = DescriptionIndex()
+            values = self.descriptions.values
+            for serial, code, cents in zip(self.serials, self.description_codes, self.cents):
+                search.add(serial, code, values[code], cents)
+            self._search = search
+        return self._search
+
+    @search.setter
+    def search(self, search):
+        self._search = search
+
+
+# Read-only account handle over a binary ledger, used by AccountRegistry
+# load() keeps the ledger mapped and returns its rows as a lazy
+# BinaryTransactions list, so queries are answered from the file's columns;
+# close() unmaps it. save() never writes: a changed balance is dropped (with a
+# warning) on eviction.
+class BinaryAccountFile:
+    def __init__(self, path):
+        self.path = path
+        self.disk_signature = None
+        self._ledger = None
+        self._loaded = None  # (balance, row count) as loaded
+
+    def signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed_on_disk(self):
+        return self.signature() != self.disk_signature
+
+    def load(self):
+        self.close()
+        self._ledger = BinaryLedger(self.path)
+        account = {"balance": self._ledger.balance, "transactions": self._ledger.transactions()}
+        self._loaded = (account["balance"], len(account["transactions"]))
+        self.disk_signature = self.signature()
+        return account
+
+    # Unmap the ledger; rows of the account it loaded can no longer be read
+    def close(self):
+        if self._ledger is not None:
+            self._ledger.close()
+            self._ledger = None
+
+    def save(self, account, force=False):
+        if force or (account["balance"], len(account["transactions"])) != self._loaded:
+            print(f"Warning: {self.path} is a read-only binary ledger; changes are not saved")
+        return False
+
+    def forget(self):
+        self._loaded = None
+
+
+# Convert account.json into a binary ledger
+def import_json(json_path, ledger_path):
+    with open(json_path, "r") as f:
+        account = json.load(f)
+    write_ledger(account, ledger_path)
+    return len(account["transactions"])
+
+
+# Convert a binary ledger back into account.json
+def export_json(ledger_path, json_path):
+    with BinaryLedger(ledger_path) as ledger:
+        account = ledger.to_account()
+    with open(json_path, "w") as f:
+        json.dump(account, f, indent=4)
+    return len(account["transactions"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between account.json and the binary ledger format.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_binary = sub.add_parser("import", help="account.json -> binary ledger")
+    to_binary.add_argument("json_path")
+    to_binary.add_argument("ledger_path")
+    to_json = sub.add_parser("export", help="binary ledger -> account.json")
+    to_json.add_argument("ledger_path")
+    to_json.add_argument("json_path")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        count = import_json(args.json_path, args.ledger_path)
+        print(f"Wrote {count} transactions to {args.ledger_path}")
+    else:
+        count = export_json(args.ledger_path, args.json_path)
+        print(f"Wrote {count} transactions to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
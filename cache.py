@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+# Default number of formatted responses kept per cache
+RESPONSE_CACHE_SIZE = 256
+
+
+# Bounded LRU cache of formatted responses with hit/miss counters
+# Keys include the ledger version, so entries for an older ledger are never
+# hit again and simply age out of the LRU.
+class ResponseCache:
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key, response):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    # Return the cached response for key, computing and storing it on a miss
+    def get_or_compute(self, key, compute):
+        response = self.get(key)
+        if response is None:
+            response = compute()
+            self.put(key, response)
+        return response
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
@@ -0,0 +1,195 @@
+import argparse
+import json
+import re
+import time
+
+from ledger import refresh_store
+from persistence import account_file
+
+# Category given to rows that no rule (and no source file) labelled
+UNCATEGORIZED = "uncategorized"
+# Per-description match results are cached; the cache is reset past this size
+DESCRIPTION_CACHE_SIZE = 200_000
+WORD_PATTERN = re.compile(r"\w+")
+# Plural endings a keyword's last word may carry ("snack" matches "Snacks")
+PLURAL_ENDINGS = ("s", "es")
+
+
+def words(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+# One categorization rule: a category plus any of
+#   keywords  - case-insensitive words or phrases (plurals included)
+#   pattern   - a regular expression searched in the description
+#   min_amount / max_amount - inclusive bounds on the signed amount
+# A rule with no keywords/pattern matches on the amount alone.
+class Rule:
+    def __init__(self, category, keywords=(), pattern=None, min_amount=None, max_amount=None):
+        self.category = category
+        self.keywords = tuple(keywords)
+        self.pattern = pattern
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["category"],
+            data.get("keywords", ()),
+            data.get("pattern"),
+            data.get("min_amount"),
+            data.get("max_amount"),
+        )
+
+    def has_text(self):
+        return bool(self.keywords or self.pattern)
+
+
+    def accepts(self, amount):
+        return (self.min_amount is None or amount >= self.min_amount) and (
+            self.max_amount is None or amount <= self.max_amount
+        )
+
+
+DEFAULT_RULES = [
+    Rule("salary", keywords=("salary", "payroll", "wages"), min_amount=0),
+    Rule("income", keywords=("refund", "interest", "dividend"), min_amount=0),
+    Rule("food", keywords=("coffee", "cafe", "café", "restaurant", "grocery", "supermarket", "bakery",
+                           "pizza", "burger", "snack", "deli", "starbucks", "mcdonald")),
+    Rule("transport", keywords=("uber", "lyft", "taxi", "bus", "train", "metro", "subway", "parking",
+                                "fuel", "petrol", "shell", "airline")),
+    Rule("utilities", keywords=("electric", "water bill", "internet", "phone bill", "utility")),
+    Rule("rent", keywords=("rent", "landlord", "mortgage")),
+    Rule("entertainment", keywords=("netflix", "spotify", "cinema", "theater", "theatre", "steam")),
+    Rule("shopping", keywords=("amazon", "ebay", "walmart", "target", "ikea")),
+    Rule("education", keywords=("book", "course", "tuition")),
+    Rule("cash", pattern=r"\batm\b"),
+    Rule("income", min_amount=0),
+]
+
+
+# Rules applied to whole batches of transactions
+# Keywords, with the plural forms of their last word, map straight to their
+# rules: a description is split into words once, then each word (and each
+# run of words starting a phrase keyword) costs a dict lookup, however many
+# rules there are. Only `pattern` rules run as regexes. The candidate list is cached per
+# distinct description; each row then only needs amount checks.
+class Categorizer:
+    def __init__(self, rules=None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self._words = {}  # one-word keyword -> indices of rules with that keyword
+        self._phrases = {}  # tuple of words -> indices of rules with that phrase
+        self._patterns = []  # (compiled pattern, rule index)
+        for i, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                keyword_words = tuple(words(keyword))
+                if not keyword_words:
+                    continue
+                head, last = keyword_words[:-1], keyword_words[-1]
+                for form in (last,) + tuple(last + ending for ending in PLURAL_ENDINGS):
+                    if head:
+                        self._phrases.setdefault(head + (form,), set()).add(i)
+                    else:
+                        self._words.setdefault(form, set()).add(i)
+            if rule.pattern:
+                self._patterns.append((re.compile(rule.pattern, re.IGNORECASE), i))
+        self._phrase_starts = {phrase[0] for phrase in self._phrases}
+        self._phrase_lengths = sorted({len(phrase) for phrase in self._phrases})
+        self._amount_only = tuple(i for i, rule in enumerate(self.rules) if not rule.has_text())
+        self._candidates = {}
+
+    # Rules with a keyword among the description's words: whole words, in
+    # sequence for phrases, the last one optionally plural
+    def _keyword_matches(self, description_words):
+        matched = set()
+        for word in description_words:
+            rules = self._words.get(word)
+            if rules is not None:
+                matched |= rules
+        if self._phrases:
+            for start, word in enumerate(description_words):
+                if word not in self._phrase_starts:
+                    continue
+                for length in self._phrase_lengths:
+                    rules = self._phrases.get(tuple(description_words[start:start + length]))
+                    if rules is not None:
+                        matched |= rules
+        return matched
+
+    # Indices of the rules whose text part matches, in rule order
+    def candidates(self, description):
+        candidates = self._candidates.get(description)
+        if candidates is None:
+            matched = self._keyword_matches(words(description))
+            matched.update(i for pattern, i in self._patterns if i not in matched and pattern.search(description))
+            candidates = tuple(sorted(matched.union(self._amount_only))) if matched else self._amount_only
+            if len(self._candidates) >= DESCRIPTION_CACHE_SIZE:
+                self._candidates.clear()
+            self._candidates[description] = candidates
+        return candidates
+
+    # Category for one transaction, or None if no rule applies
+    def categorize(self, description, amount):
+        rules = self.rules
+        for i in self.candidates(description):
+            if rules[i].accepts(amount):
+                return rules[i].category
+        return None
+
+    # Fill in categories for a batch of transactions in place
+    # Only rows without a category (or "uncategorized") are touched unless
+    # overwrite is set. Returns the number of rows changed.
+    def categorize_batch(self, transactions, overwrite=False):
+        changed = 0
+        for t in transactions:
+            if not overwrite and t.get("category") not in (None, "", UNCATEGORIZED):
+                continue
+            category = self.categorize(t["description"], t["amount"])
+            if category is not None and category != t.get("category"):
+                t["category"] = category
+                changed += 1
+        return changed
+
+    # Importer transform: categorize each chunk as it is parsed
+    def categorize_chunk(self, chunk):
+        self.categorize_batch(chunk)
+        return chunk
+
+
+# Categorize a whole account in place and refresh its column store
+def categorize_account(account, categorizer=None, overwrite=False):
+    categorizer = categorizer or Categorizer()
+    changed = categorizer.categorize_batch(account["transactions"], overwrite)
+    if changed:
+        refresh_store(account["transactions"])
+    return changed
+
+
+# Load rules from a JSON file: a list of {"category", "keywords", "pattern", "min_amount", "max_amount"}
+def load_rules(path):
+    with open(path, "r") as f:
+        return [Rule.from_dict(data) for data in json.load(f)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign categories to uncategorized transactions.")
+    parser.add_argument("--account-file", default="account.json")
+    parser.add_argument("--rules", help="JSON rules file (default: built-in rules)")
+    parser.add_argument("--overwrite", action="store_true", help="recategorize rows that already have a category")
+    args = parser.parse_args(argv)
+
+    categorizer = Categorizer(load_rules(args.rules) if args.rules else None)
+    handle = account_file(args.account_file)
+    account = handle.load()
+    started = time.perf_counter()
+    changed = categorize_account(account, categorizer, args.overwrite)
+    elapsed = time.perf_counter() - started
+    if changed:
+        # Existing rows were edited in place, which the journal cannot express
+        handle.save(account, force=True)
+    print(f"Categorized {changed} of {len(account['transactions'])} transactions in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
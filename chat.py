@@ -0,0 +1,524 @@
+# Query answering for FinChat: the intent router, its handlers and
+# process_query(), with no UI, so the Streamlit app (main.py), the HTTP API
+# (api.py) and the benchmarks (bench.py) share them
+import re
+from datetime import datetime, timedelta, date, MINYEAR, MAXYEAR
+from ledger import store_for, to_cents, money
+from analytics import series_for, month_bounds, months_to_date
+from history import HistoryFilter, INCOME, first_page, next_page
+from persistence import account_file
+from intents import IntentRouter, text_after, word_after
+from cache import ResponseCache
+from accounts import AccountRegistry, DEFAULT_ACCOUNT_ID
+from metrics import metrics
+
+# Mock bank account data (loaded from/saved to JSON)
+ACCOUNT_FILE = "account.json"
+DEFAULT_ACCOUNT = {
+    "balance": 500.00,
+    "transactions": [
+        {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+        {"date": "2025-05-02", "amount": -20.00, "description": "Grocery Store", "category": "food"},
+        {"date": "2025-05-03", "amount": 100.00, "description": "Salary Deposit", "category": "income"},
+        {"date": "2025-05-04", "amount": -30.00, "description": "Restaurant", "category": "food"},
+        {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+    ]
+}
+
+
+# Load or initialize account data (snapshot plus journal replay)
+def load_account():
+    return account_file(ACCOUNT_FILE, DEFAULT_ACCOUNT).load()
+
+
+# Save account data (journals new rows; writes nothing if unchanged)
+def save_account(account):
+    account_file(ACCOUNT_FILE, DEFAULT_ACCOUNT).save(account)
+
+
+# Accounts of callers without a registry of their own (api.py, bench.py);
+# the default one is ACCOUNT_FILE
+registry = AccountRegistry(ACCOUNT_FILE, DEFAULT_ACCOUNT)
+# Set to answer from a given account instead of the registry's default one
+account = None
+
+
+# The account used when none is passed explicitly (loaded on first use)
+def default_account():
+    if account is not None:
+        return account
+    return registry.get(DEFAULT_ACCOUNT_ID)
+
+
+# Get total spent by category
+def get_spending_by_category(category, account=None):
+    if account is None:
+        account = default_account()
+    aggregates = store_for(account["transactions"]).aggregates
+    return money(aggregates.spending_by_category(category))
+
+
+# Get total income
+def get_total_income(transactions):
+    return money(store_for(transactions).aggregates.total_income)
+
+
+# Get total spent
+def get_total_spent(transactions):
+    return money(store_for(transactions).aggregates.total_spent)
+
+
+# Get income by category
+def get_income_by_category(category_name, account=None):
+    if account is None:
+        account = default_account()
+    aggregates = store_for(account["transactions"]).aggregates
+    return money(aggregates.income_by_category_like(category_name))
+
+
+# Get largest transaction
+def get_largest_transaction(account=None):
+    if account is None:
+        account = default_account()
+    index = store_for(account["transactions"]).largest_expense_index()
+    if index is None:
+        return None
+    return account["transactions"][index]
+
+
+# Get spending by date range
+def get_spending_by_date_range(transactions, start_date_obj, end_date_obj):
+    return money(store_for(transactions).spending_between_cents(start_date_obj, end_date_obj))
+
+
+# Get income by date range
+def get_income_by_date_range(transactions, start_date_obj, end_date_obj):
+    return money(store_for(transactions).income_between_cents(start_date_obj, end_date_obj))
+
+
+# Query intents (rule-based)
+# Each intent lists the keywords that trigger it; they are tried in the order
+# registered here, so more specific intents must come first.
+# Built once per process, when this module is first imported.
+router = IntentRouter()
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4,
+    "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12
+}
+
+# Categories with a "spend on <category>" intent
+SPENDING_CATEGORIES = ("food", "transport")
+
+# Analytics queries name a category after one of these cue words
+# ("spending on food per month", "average weekly transport"), unless the
+# following word is one of GENERIC_WORDS
+CATEGORY_CUES = (("on", "for"), ("weekly", "monthly", "average", "rolling"))
+GENERIC_WORDS = {
+    "spend", "spent", "spending", "expense", "expenses", "weekly", "monthly", "average", "per", "my", "the",
+    "all", "total", "everything", "this", "last", "in", "a", "week", "month", "day", "days", "year", "rolling",
+}
+MONTH_PATTERN = re.compile(r"\b(" + "|".join(MONTHS) + r")\b(?:\s+(\d{4}))?")
+DEFAULT_ROLLING_DAYS = 30
+# Longest rolling window answered (about ten years)
+MAX_ROLLING_DAYS = 3650
+
+
+# Slot extractor: the category an analytics query is about, or None for all spending
+def category_slot(query, text):
+    words = re.findall(r"[a-z]+", query)
+    for cues in CATEGORY_CUES:
+        for word, following in zip(words, words[1:]):
+            if word in cues and following not in GENERIC_WORDS and following not in MONTHS:
+                return {"category": following}
+    return {"category": None}
+
+
+# Slot extractor: category plus "last year" or an explicit year ("per month in 2024")
+def category_year_slots(query, text):
+    year = re.search(r"\b(\d{4})\b", query)
+    return {**category_slot(query, text), "year": year.group(1) if year else ("last" if "last year" in query else None)}
+
+
+# Slot extractor: category plus the months named, in order, each with an optional year
+def compare_slots(query, text):
+    months = tuple((name, int(year) if year else None) for name, year in MONTH_PATTERN.findall(query))
+    return {**category_slot(query, text), "months": months}
+
+
+# Slot extractor: category plus the window length ("30-day rolling spend"),
+# or None for a length outside 1..MAX_ROLLING_DAYS
+def rolling_slots(query, text):
+    found = re.search(r"(\d+)[- ]?days?", query)
+    days = int(found.group(1)) if found else DEFAULT_ROLLING_DAYS
+    return {**category_slot(query, text), "days": days if 1 <= days <= MAX_ROLLING_DAYS else None}
+
+
+# Slot extractor: the month after "in", plus its year if given ("in March 2024")
+def month_year_slots(query, text):
+    found = re.search(r"\bin\s+" + MONTH_PATTERN.pattern, query)
+    if found is None:
+        return {**word_after("in ", "month_name_str")(query, text), "year": None}
+    return {"month_name_str": found.group(1), "year": int(found.group(2)) if found.group(2) else None}
+
+
+# Words around "transactions" in a history request that do not name a merchant
+HISTORY_WORDS = {
+    "show", "me", "my", "all", "the", "recent", "latest", "last", "income", "list", "see", "view", "of", "your",
+    "what", "are", "can", "could", "you", "please", "give", "get", "how", "many", "do", "i", "have",
+}
+
+
+# Slot extractor: the merchant in "transactions from Uber", keeping its casing
+def merchant_slot(query, text):
+    found = re.search(r"\btransactions? (?:from|at|with) (.+)", text, re.IGNORECASE)
+    return {"merchant": found.group(1).strip().rstrip("?.!") if found else ""}
+
+
+# Slot extractor for history: income only, plus the words before "transactions"
+# that may name a merchant ("show Uber transactions"), or None
+def history_slots(query, text):
+    found = re.search(r"(.*?)\btransactions?\b", text, re.IGNORECASE)
+    words = [word for word in (found.group(1).split() if found else []) if word.lower() not in HISTORY_WORDS]
+    return {"income_only": "income" in query, "merchant": " ".join(words) or None}
+
+
+# Cached answers, keyed on intent, slots, date window and ledger version
+response_cache = ResponseCache()
+
+
+# Date windows for relative periods, resolved before the cache lookup so that
+# "last week" asked just before and after midnight gets different keys
+def last_week_window():
+    today = date.today()
+    start_of_last_week = today - timedelta(days=today.weekday() + 7)
+    end_of_last_week = today - timedelta(days=today.weekday() + 1)
+    return start_of_last_week, end_of_last_week
+
+
+def last_month_window():
+    today = date.today()
+    first_day_current_month = today.replace(day=1)
+    end_of_last_month = first_day_current_month - timedelta(days=1)
+    start_of_last_month = end_of_last_month.replace(day=1)
+    return start_of_last_month, end_of_last_month
+
+
+# A year a date can have
+def valid_year(year):
+    return MINYEAR <= year <= MAXYEAR
+
+
+# Named month of the given or current year, or None if the month is not recognised
+def calendar_month_window(month_name_str, year=None):
+    month_number = MONTHS.get(month_name_str)
+    if not month_number or (year is not None and not valid_year(year)):
+        return None
+    year = year or datetime.now().year
+    start_date_month = date.today().replace(year=year, month=month_number, day=1)
+    if month_number == 12:
+        end_date_month = start_date_month.replace(day=31)
+    else:
+        end_date_month = start_date_month.replace(month=month_number + 1) - timedelta(days=1)
+    return start_date_month, end_date_month
+
+
+# Months of a year: this year up to the current month, or all of another year;
+# None for a year no date can have
+def year_months_window(category, year):
+    today = date.today()
+    if year == "last":
+        year = today.year - 1
+    year = int(year) if year else today.year
+    if not valid_year(year):
+        return None
+    if year == today.year:
+        return months_to_date(today)
+    return tuple(month_bounds(year, month) for month in range(1, 13))
+
+
+# Calendar months to compare; months without a year are in the current year
+def compare_window(category, months):
+    current_year = date.today().year
+    months = [(current_year if year is None else year, MONTHS[name]) for name, year in months]
+    if not all(valid_year(year) for year, _ in months):
+        return None
+    return tuple(month_bounds(year, month) for year, month in months)
+
+
+# The `days` days up to and including today
+def rolling_window(category, days):
+    if days is None:
+        return None
+    today = date.today()
+    return today - timedelta(days=days - 1), today
+
+
+def today_window(category):
+    return date.today()
+
+
+# Check balance (not cached: the balance is not part of the ledger version)
+@router.intent("balance", when=["balance"], cacheable=False)
+def answer_balance(account):
+    return f"Your balance is ${money(to_cents(account['balance'])):.2f}."
+
+
+# Next page of the last transaction list, e.g. "show more"
+# Not cached: each call moves the list further back in time.
+@router.intent("history_more", when=["show more", "more transactions"], cacheable=False)
+def answer_history_more(account, session):
+    page = next_page(account["transactions"], session)
+    if page is None:
+        return "Ask for your transactions first (e.g., 'show transactions')."
+    if not page:
+        return "No more transactions."
+    return format_history("Earlier transactions:", page)
+
+
+# Transactions whose description matches a merchant, e.g. "transactions from Uber"
+# Not cached: showing a list restarts "show more" from its first page.
+@router.intent(
+    "merchant_history",
+    when=["transactions from", "transaction from", "transactions at", "transactions with"],
+    slots=merchant_slot,
+    cacheable=False,
+)
+def answer_merchant_history(merchant, account, session):
+    if not merchant:
+        return "Please name a merchant (e.g., 'transactions from Coffee Shop')."
+    page = first_page(account["transactions"], session, HistoryFilter(merchant=merchant))
+    if not page:
+        return f"No transactions found matching '{merchant}'."
+    return format_history(f"Transactions matching '{merchant}':", page)
+
+
+# List transactions (general, or filtered for income), most recent first
+# Handles "transaction history", "show my transactions", "show income transactions"
+# and "show Uber transactions"
+# Not cached: showing a list restarts "show more" from its first page.
+@router.intent("history", when=["transaction", "history"], slots=history_slots, cacheable=False)
+def answer_history(income_only, merchant, account, session):
+    # Leading words only name a merchant if some description matches them
+    if merchant and store_for(account["transactions"]).search.match(merchant):
+        return answer_merchant_history(merchant, account, session)
+    if income_only:  # e.g. "show income transactions"
+        page = first_page(account["transactions"], session, HistoryFilter(sign=INCOME))
+        if not page:
+            return "No income transactions found."
+        return format_history("Income transactions:", page)
+    page = first_page(account["transactions"], session)
+    if not page:
+        return "No transactions found."
+    return format_history("Recent transactions:", page)
+
+
+def format_history(title, page):
+    response = title + "\n"
+    for t in page:
+        response += f"{t['date']}: {t['description']} (${t['amount']:+.2f}, {t['category']})\n"
+    if page.next_cursor is not None:
+        response += "Say 'show more' for earlier transactions.\n"
+    return response.strip()
+
+
+# Spending at a merchant, e.g. "how much did I spend at Coffee Shop?"
+# Summed from the description index's per-term totals, not by scanning rows.
+@router.intent("spent_at", when=["spent at", "spend at", "spending at", "paid at"], slots=text_after(" at ", "merchant"))
+def answer_spent_at(merchant, account):
+    if not merchant:
+        return "Please name a merchant (e.g., 'how much did I spend at Coffee Shop?')."
+    search = store_for(account["transactions"]).search
+    income, spend, rows, spend_rows = search.totals_for(merchant)
+    if not rows:
+        return f"No transactions found matching '{merchant}'."
+    response = f"You spent ${money(spend):.2f} at {merchant} ({spend_rows} transaction{'s' if spend_rows != 1 else ''})."
+    matched = sorted(store_for(account["transactions"]).descriptions.values[code] for code in search.match(merchant))
+    if [name.lower() for name in matched] != [merchant.lower()]:
+        shown = ", ".join(matched[:3]) + (f" and {len(matched) - 3} more" if len(matched) > 3 else "")
+        response += f" Matched: {shown}."
+    return response
+
+
+# Total spending (more specific to avoid clashes), e.g. "how much have I spent in total?"
+@router.intent("total_spent", when=[("spent", "total")])
+def answer_total_spent(account):
+    total_spent_val = get_total_spent(account["transactions"])
+    return f"You've spent ${total_spent_val:.2f} in total."
+
+
+# Total income, e.g. "how much income in total?"
+@router.intent("total_income", when=[("income", "total")])
+def answer_total_income(account):
+    total_income_val = get_total_income(account["transactions"])
+    return f"Your total income is ${total_income_val:.2f}."
+
+
+# Spending per month, e.g. "spending on food per month this year"
+@router.intent(
+    "spend_per_month",
+    when=[("per month", "spen"), ("per month", "expenses"), ("monthly", "spen"), ("monthly", "expenses")],
+    slots=category_year_slots,
+    window=year_months_window,
+)
+def answer_spending_per_month(category, year, window, account):
+    if window is None:
+        return f"Please name a year between {MINYEAR} and {MAXYEAR} (e.g., 'spending per month in 2024')."
+    totals = series_for(account["transactions"]).spending_by_period(window, category)
+    subject = f"Spending on {category}" if category else "Spending"
+    response = f"{subject} per month in {window[0][0].year}:\n"
+    for (start, _), cents in zip(window, totals):
+        response += f"{start.strftime('%B')}: ${money(cents):.2f}\n"
+    response += f"Total: ${money(sum(totals)):.2f}"
+    return response
+
+
+# Month-over-month comparison, e.g. "compare March vs April"
+@router.intent("compare_months", when=["compare"], slots=compare_slots, window=compare_window)
+def answer_compare_months(category, months, window, account):
+    if window is None:
+        return f"Please use years between {MINYEAR} and {MAXYEAR} (e.g., 'compare March 2024 vs April 2024')."
+    if len(window) < 2:
+        return "Please name two months to compare (e.g., 'compare March vs April')."
+    (first, _), (second, _) = window[0], window[1]
+    before, after = series_for(account["transactions"]).spending_by_period(window[:2], category)
+    first_name, second_name = first.strftime("%B %Y"), second.strftime("%B %Y")
+    subject = f" on {category}" if category else ""
+    response = f"You spent ${money(before):.2f}{subject} in {first_name} and ${money(after):.2f} in {second_name}"
+    if after == before:
+        return response + ": the same amount."
+    change = f"${money(abs(after - before)):.2f} {'more' if after > before else 'less'}"
+    if before:
+        change += f" ({(after - before) / before:+.0%})"
+    return f"{response}: {change} in {second_name}."
+
+
+# Rolling window spend, e.g. "30-day rolling spend"
+@router.intent("rolling_spend", when=["rolling"], slots=rolling_slots, window=rolling_window)
+def answer_rolling_spend(category, days, window, account):
+    if window is None:
+        return f"Please choose a window of 1 to {MAX_ROLLING_DAYS} days (e.g., '30-day rolling spend')."
+    start, end = window
+    series = series_for(account["transactions"])
+    current, previous = series.rolling_spending(days, (end, start - timedelta(days=1)), category)
+    subject = f" on {category}" if category else ""
+    return (
+        f"You spent ${money(current):.2f}{subject} in the last {days} days "
+        f"(from {start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}), ${money(current) / days:.2f} per day. "
+        f"The {days} days before: ${money(previous):.2f}."
+    )
+
+
+# Average weekly spend since the first transaction, e.g. "average weekly transport"
+@router.intent("average_weekly", when=[("average", "week")], slots=category_slot, window=today_window)
+def answer_average_weekly(category, window, account):
+    series = series_for(account["transactions"])
+    first_day = series.first_day
+    if first_day is None or first_day > window:
+        return "No transactions found."
+    days = (window - first_day).days + 1
+    per_week = money(series.spending_between(first_day, window, category)) * 7 / max(days, 7)
+    subject = f" on {category}" if category else ""
+    return f"You spend ${per_week:.2f} per week{subject} on average (over {days / 7:.1f} weeks since {first_day.strftime('%Y-%m-%d')})."
+
+
+# Spending by category, e.g. "how much did I spend on food?"
+def answer_spending_on_category(category, account):
+    total = get_spending_by_category(category, account)
+    return f"You spent ${total:.2f} on {category}."
+
+
+for spending_category in SPENDING_CATEGORIES:
+    router.add(
+        f"spend_on_{spending_category}",
+        when=[f"spend on {spending_category}", (spending_category, "spent")],
+        handler=answer_spending_on_category,
+        slots={"category": spending_category},
+    )
+
+
+# Income by category (e.g., "income from salary")
+@router.intent("income_from", when=["income from"], slots=text_after("income from", "category_name"))
+def answer_income_from(category_name, account):
+    if category_name:
+        total_income_cat = get_income_by_category(category_name, account)
+        if total_income_cat > 0:
+            return f"You received ${total_income_cat:.2f} as income from {category_name}."
+        else:
+            return f"No income found from {category_name} or '{category_name}' is not an income category."
+    else:  # "income from " with nothing after
+        return "Please specify a category for income (e.g., 'income from salary')."
+
+
+# Income last month
+@router.intent("income_last_month", when=[("last month", "income")], window=last_month_window)
+def answer_income_last_month(window, account):
+    start_of_last_month, end_of_last_month = window
+    total_income_last_month = get_income_by_date_range(account["transactions"], start_of_last_month, end_of_last_month)
+    return f"Your income last month ({start_of_last_month.strftime('%B %Y')}) was ${total_income_last_month:.2f} (from {start_of_last_month.strftime('%Y-%m-%d')} to {end_of_last_month.strftime('%Y-%m-%d')})."
+
+
+# Largest transaction (implies expense)
+@router.intent("largest_expense", when=["largest", "biggest"])
+def answer_largest_expense(account):
+    largest = get_largest_transaction(account)
+    if largest:
+        return f"Your largest expense was ${abs(largest['amount']):.2f} at {largest['description']} on {largest['date']}."
+    return "No expenses found."
+
+
+# Spending last week
+@router.intent("spend_last_week", when=[("last week", "spend")], window=last_week_window)
+def answer_spending_last_week(window, account):
+    start_of_last_week, end_of_last_week = window
+    total_spent = get_spending_by_date_range(account["transactions"], start_of_last_week, end_of_last_week)
+    return f"You spent ${total_spent:.2f} last week (from {start_of_last_week.strftime('%Y-%m-%d')} to {end_of_last_week.strftime('%Y-%m-%d')})."
+
+
+# Spending in a specific month, e.g. "how much did I spend in May?" or "in March 2024"
+# Basic month extraction, assumes "in [Month]" format for spending
+@router.intent(
+    "spend_in_month",
+    when=[("in ", "spend"), ("in ", "expenses")],
+    slots=month_year_slots,
+    window=calendar_month_window,
+)
+def answer_spending_in_month(month_name_str, year, window, account):
+    if window is None:
+        return (
+            "Could not determine the month from your query. Please use a full month name, "
+            f"optionally with a year from {MINYEAR} to {MAXYEAR} (e.g., 'in April' or 'in April 2024')."
+        )
+
+    start_date_month, end_date_month = window
+    total_spent = get_spending_by_date_range(account["transactions"], start_date_month, end_date_month)
+    return f"You spent ${total_spent:.2f} in {month_name_str.capitalize()} {start_date_month.year} (from {start_date_month.strftime('%Y-%m-%d')} to {end_date_month.strftime('%Y-%m-%d')})."
+
+
+# Default response
+@router.default
+def answer_unknown(account):
+    return "Sorry, I didn't understand. Try asking about balance, transactions, spending, or largest expense."
+
+
+# "Show more" state of callers that pass no session (scripts, tests)
+default_session = {}
+
+
+# Process user query (rule-based) against the given account
+# session is the caller's chat session state (st.session_state in the app);
+# cache replaces response_cache (the app keeps its own across reruns).
+def process_query(query, account=None, session=None, cache=None):
+    if account is None:
+        account = default_account()
+    if session is None:
+        session = default_session
+    if cache is None:
+        cache = response_cache
+    # Building the column store (first query after a load) is where dates get parsed
+    with metrics.span("index"):
+        version = store_for(account["transactions"]).version
+    return router.dispatch(
+        query, cache=cache, version=version, metrics=metrics, account=account, session=session
+    )
@@ -0,0 +1,176 @@
+import weakref
+from bisect import bisect_left, bisect_right
+
+from ledger import store_for, INVALID_DAY
+
+# Rows per page in the chat's transaction lists
+DEFAULT_PAGE_SIZE = 5
+# Cost of listing one posting (serial lookup and sort) relative to one step of
+# the date-index walk; decides which of the two serves a merchant filter
+POSTING_COST = 5
+INCOME = 1
+EXPENSE = -1
+
+
+# Filters for a history view; every field is optional
+#   sign     - INCOME or EXPENSE
+#   category - category name, matched case-insensitively
+#   start / end - inclusive date bounds
+#   text     - case-insensitive substring of the description
+#   merchant - description search (terms, prefixes, near misses) via the store's DescriptionIndex
+class HistoryFilter:
+    def __init__(self, sign=None, category=None, start=None, end=None, text=None, merchant=None):
+        self.sign = sign
+        self.category = category
+        self.start = start
+        self.end = end
+        self.text = text
+        self.merchant = merchant
+
+    # Predicate over row indexes of a store, or None when nothing is filtered
+    def matcher(self, store):
+        checks = []
+        cents = store.cents
+        if self.sign == INCOME:
+            checks.append(lambda row: cents[row] > 0)
+        elif self.sign == EXPENSE:
+            checks.append(lambda row: cents[row] < 0)
+        if self.category:
+            categories = store.category_codes_like(self.category)
+            category_codes = store.category_codes
+            checks.append(lambda row: category_codes[row] in categories)
+        if self.text:
+            needle = self.text.lower()
+            descriptions = {code for code, value in enumerate(store.descriptions.values) if needle in value.lower()}
+            description_codes = store.description_codes
+            checks.append(lambda row: description_codes[row] in descriptions)
+        if self.merchant:
+            merchants = store.search.match(self.merchant)
+            description_codes = store.description_codes
+            checks.append(lambda row: description_codes[row] in merchants)
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda row: all(check(row) for check in checks)
+
+
+# One page of history, most recent first
+# next_cursor is passed back to get the following page; None on the last page.
+class Page:
+    def __init__(self, rows, next_cursor):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+# Keyset cursor "<day ordinal>:<serial>" of the last row shown; it stays valid
+# when rows are appended or removed, unlike an offset
+def encode_cursor(day, serial):
+    return f"{day}:{serial}"
+
+
+def decode_cursor(cursor):
+    try:
+        day, serial = cursor.split(":")
+        return int(day), int(serial)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from None
+
+
+# A page of transactions, newest first (rows on the same day: latest added first)
+# Served from the store's date index: the date range and cursor are bisected,
+# then the index is walked backwards until `limit` rows pass the filter, so no
+# sorting happens per request. A merchant filter so rare that the walk would
+# be long instead sorts just the rows in its postings. Rows with unparsable dates are not listed.
+def history_page(transactions, history_filter=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    history_filter = history_filter or HistoryFilter()
+    store = store_for(transactions)
+    index = store.date_index
+    days, rows, serials = index.days, index.rows, store.serials
+
+    lo = bisect_left(days, history_filter.start.toordinal()) if history_filter.start else 0
+    hi = bisect_right(days, history_filter.end.toordinal()) if history_filter.end else len(days)
+    if cursor is not None:
+        day, serial = decode_cursor(cursor)
+        # Position of the cursor row: entries of one day are in serial order
+        position = bisect_left(rows, serial, bisect_left(days, day), bisect_right(days, day), key=serials.__getitem__)
+        hi = min(hi, position)
+    if lo >= hi:
+        return Page([], None)
+
+    match = history_filter.matcher(store)
+    if history_filter.merchant:
+        codes = store.search.match(history_filter.merchant)
+        matches = sum(store.search.totals[code][2] for code in codes)
+        # The walk needs about (limit + 1) * (hi - lo) / matches steps for a page
+        if matches * matches * POSTING_COST < (limit + 1) * (hi - lo):
+            upper = (days[hi], serials[rows[hi]]) if hi < len(days) else None
+            keys = _posting_keys(store, codes, (days[lo], serials[rows[lo]]), upper)
+            return _page(store, keys, match, limit)
+    keys = ((days[i], serials[rows[i]], rows[i]) for i in range(hi - 1, lo - 1, -1))
+    return _page(store, keys, match, limit)
+
+
+# (day, serial, row) of the live rows with the given descriptions whose
+# (day, serial) lies in [lower, upper), newest first
+def _posting_keys(store, codes, lower, upper):
+    store_days = store.days
+    keys = []
+    for serial in store.search.serials_for(codes):
+        row = store.index_of_serial(serial)
+        if row is None or store_days[row] == INVALID_DAY:
+            continue
+        key = (store_days[row], serial)
+        if key >= lower and (upper is None or key < upper):
+            keys.append((store_days[row], serial, row))
+    keys.sort(reverse=True)
+    return keys
+
+
+# First `limit` rows from (day, serial, row) keys that pass the filter
+def _page(store, keys, match, limit):
+    found = []
+    for key in keys:
+        if match is None or match(key[2]):
+            found.append(key)
+            if len(found) > limit:
+                break
+    next_cursor = None
+    if len(found) > limit:
+        found.pop()
+        next_cursor = encode_cursor(found[-1][0], found[-1][1])
+    return Page([store.row(row) for _, _, row in found], next_cursor)
+
+
+# "Show more" state lives in a mapping owned by the caller, one per chat
+# session (e.g. st.session_state), so sessions page through lists independently.
+# Under SESSION_KEY it holds (store, filter, next cursor) of the last page
+# shown; the store is weakly referenced, so reloading an account starts over.
+SESSION_KEY = "history_page"
+
+
+# First page of a history view; remembers where it stopped for next_page()
+def first_page(transactions, session, history_filter=None, limit=DEFAULT_PAGE_SIZE):
+    page = history_page(transactions, history_filter, limit)
+    session[SESSION_KEY] = (weakref.ref(store_for(transactions)), history_filter, page.next_cursor)
+    return page
+
+
+# The page after the last one this session was shown by first_page()/next_page():
+# empty once the view is exhausted, None if no history view was started
+def next_page(transactions, session, limit=DEFAULT_PAGE_SIZE):
+    state = session.get(SESSION_KEY)
+    if state is None or state[0]() is not store_for(transactions):
+        return None
+    store_ref, history_filter, cursor = state
+    if cursor is None:
+        return Page([], None)
+    page = history_page(transactions, history_filter, limit, cursor)
+    session[SESSION_KEY] = (store_ref, history_filter, page.next_cursor)
+    return page
@@ -0,0 +1,274 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from collections import Counter
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+
+from categorizer import Categorizer, UNCATEGORIZED, load_rules
+from ledger import store_for, to_cents, from_cents
+from persistence import account_file
+
+# Rows are parsed and deduplicated this many at a time
+CHUNK_SIZE = 10_000
+FORMATS = ("csv", "jsonl", "ofx")
+
+# Accepted spellings of each field in CSV headers / JSONL keys (lower-case)
+FIELD_ALIASES = {
+    "date": ("date", "transaction date", "posted date", "posting date", "booking date", "dtposted"),
+    "amount": ("amount", "amt", "value", "trnamt"),
+    "debit": ("debit", "withdrawal", "money out"),
+    "credit": ("credit", "deposit", "money in"),
+    "description": ("description", "memo", "payee", "name", "details", "narrative"),
+    "category": ("category",),
+}
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d", "%Y%m%d")
+
+
+# Normalize a date string to "YYYY-MM-DD" (cached: exports repeat dates heavily)
+@lru_cache(maxsize=4096)
+def normalize_date(value):
+    value = value.strip()
+    if len(value) == 10 and value[4] == "-":
+        return date.fromisoformat(value).isoformat()
+    if len(value) > 8 and value[:8].isdigit():  # OFX: YYYYMMDD[HHMMSS[.XXX][TZ]]
+        value = value[:8]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+# Normalize an amount string ("$1,234.50", "(12.00)", "-3") to integer cents
+def normalize_cents(value):
+    if isinstance(value, (int, float)):
+        return to_cents(value)
+    text = value.strip().replace(",", "").replace("$", "").replace(" ", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    cents = to_cents(text)
+    return -cents if negative else cents
+
+
+# Map a source record (dict with arbitrary keys) into the account.json schema
+def normalize_record(record, fields):
+    if fields["amount"] is not None and record.get(fields["amount"]) not in (None, ""):
+        cents = normalize_cents(record[fields["amount"]])
+    else:
+        debit = record.get(fields["debit"]) if fields["debit"] else None
+        credit = record.get(fields["credit"]) if fields["credit"] else None
+        if not debit and not credit:
+            raise ValueError("No amount")
+        cents = (normalize_cents(credit) if credit else 0) - (abs(normalize_cents(debit)) if debit else 0)
+    description = (record.get(fields["description"]) or "").strip() if fields["description"] else ""
+    category = (record.get(fields["category"]) or "").strip() if fields["category"] else ""
+    return {
+        "date": normalize_date(str(record[fields["date"]])),
+        "amount": from_cents(cents),
+        "description": description,
+        "category": category or UNCATEGORIZED,
+    }
+
+
+# Pick the source key used for each schema field
+def resolve_fields(keys):
+    lowered = {key.strip().lower(): key for key in keys if key is not None}
+    fields = {}
+    for field, aliases in FIELD_ALIASES.items():
+        fields[field] = next((lowered[alias] for alias in aliases if alias in lowered), None)
+    if fields["date"] is None or (fields["amount"] is None and fields["debit"] is None and fields["credit"] is None):
+        raise ValueError(f"Could not find date/amount columns in {sorted(lowered)}")
+    return fields
+
+
+# Streaming readers: each yields raw records one at a time
+def read_csv(f):
+    reader = csv.DictReader(f)
+    for record in reader:
+        yield record
+
+
+# A malformed line is passed on as its error, so the import rejects just that row
+def read_jsonl(f):
+    for line in f:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"invalid JSON ({e})")
+
+
+# Minimal OFX/QFX reader: <STMTTRN> blocks with DTPOSTED, TRNAMT, NAME, MEMO
+# Works for both SGML (unclosed tags) and XML flavours.
+# A transaction ends at </STMTTRN>, the next <STMTTRN> or </BANKTRANLIST>,
+# wherever it is on the line, so single-line XML files yield every transaction.
+OFX_TAG = re.compile(r"<(/?\w+)>([^<\r\n]*)")
+
+
+def read_ofx(f):
+    record = None
+    for line in f:
+        for tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag in ("STMTTRN", "/STMTTRN", "/BANKTRANLIST"):
+                if record is not None:
+                    yield record
+                record = {} if tag == "STMTTRN" else None
+            elif record is not None and not tag.startswith("/") and value.strip():
+                record.setdefault(tag.lower(), value.strip())
+    if record is not None:
+        yield record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "ofx": read_ofx}
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("ofx", "qfx"):
+        return "ofx"
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    return "csv"
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "rows_read": self.rows_read,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+    def __str__(self):
+        return (
+            f"Read {self.rows_read} rows in {self.seconds:.2f}s ({self.rows_per_sec:,.0f} rows/sec): "
+            f"{self.imported} imported, {self.duplicates} duplicates, {self.rejected} rejected"
+        )
+
+
+# Stream normalized transactions from a file, CHUNK_SIZE at a time
+def iter_chunks(f, fmt, report, chunk_size=CHUNK_SIZE):
+    records = READERS[fmt](f)
+    fields = None
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        if fields is None:
+            first = next((record for record in chunk if isinstance(record, dict)), None)
+            fields = resolve_fields(first.keys()) if first is not None else None
+        normalized = []
+        for record in chunk:
+            report.rows_read += 1
+            try:
+                if isinstance(record, Exception):  # unreadable row, reported by the reader
+                    raise record
+                if not isinstance(record, dict):
+                    raise TypeError(f"expected an object, got {type(record).__name__}")
+                normalized.append(normalize_record(record, fields))
+            except (KeyError, TypeError, ValueError) as e:
+                report.rejected += 1
+                if report.rejected <= 5:
+                    print(f"Warning: Skipping row {report.rows_read}: {e}")
+        yield normalized
+
+
+# Dedup key of a transaction: (date, amount in cents, description)
+def dedup_key(t):
+    return t["date"], to_cents(t["amount"]), t["description"]
+
+
+# Count of each key already in a ledger, built from its column store
+def existing_keys(transactions):
+    store = store_for(transactions)
+    dates, descriptions = store.dates.values, store.descriptions.values
+    return Counter(
+        (dates[d], cents, descriptions[desc])
+        for d, cents, desc in zip(store.date_codes, store.cents, store.description_codes)
+    )
+
+
+# Import transactions from an open file into an account (in memory)
+# New rows are appended and the balance is moved by their total. A row whose
+# (date, amount, description) is already in the account is skipped, once per
+# existing copy: two identical purchases in the file against one in the
+# account import one row. "transform" may rewrite each chunk before it is merged.
+def import_into(account, f, fmt, chunk_size=CHUNK_SIZE, transform=None):
+    report = ImportReport()
+    started = time.perf_counter()
+    transactions = account["transactions"]
+    existing = existing_keys(transactions)
+    new_rows = []
+    for chunk in iter_chunks(f, fmt, report, chunk_size):
+        if transform is not None:
+            chunk = transform(chunk)
+        for t in chunk:
+            key = dedup_key(t)
+            if existing[key] > 0:
+                existing[key] -= 1
+                report.duplicates += 1
+                continue
+            new_rows.append(t)
+
+    transactions.extend(new_rows)
+    imported_cents = sum(to_cents(t["amount"]) for t in new_rows)
+    account["balance"] = from_cents(to_cents(account["balance"]) + imported_cents)
+    report.imported = len(new_rows)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# Import a file into an account file and persist the result in one write
+def import_file(path, account_path, fmt=None, chunk_size=CHUNK_SIZE, transform=None):
+    fmt = fmt or detect_format(path)
+    handle = account_file(account_path, {"balance": 0.0, "transactions": []})
+    account = handle.load()
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        report = import_into(account, f, fmt, chunk_size, transform)
+    started = time.perf_counter()
+    handle.save(account)
+    report.seconds += time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import bank exports (CSV, JSONL, OFX) into a FinChat account.")
+    parser.add_argument("path", help="file to import")
+    parser.add_argument("--account-file", default="account.json", help="account to import into (default: account.json)")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--categorize", action="store_true", help="auto-categorize uncategorized rows")
+    parser.add_argument("--rules", help="JSON rules file for --categorize (default: built-in rules)")
+    args = parser.parse_args(argv)
+
+    transform = None
+    if args.categorize:
+        transform = Categorizer(load_rules(args.rules) if args.rules else None).categorize_chunk
+    report = import_file(args.path, args.account_file, args.format, args.chunk_size, transform)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import inspect
+from collections import deque
+
+from metrics import Metrics
+
+# Routing decisions are memoized per set of matched keywords; cap the memo size
+DECISION_CACHE_SIZE = 4096
+# Used when dispatch() is given no metrics: spans are no-ops
+NO_METRICS = Metrics(enabled=False)
+
+
+# Aho-Corasick automaton: finds every keyword in a text in one pass,
+# including overlapping ones ("spend" inside "spend on food")
+class KeywordAutomaton:
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for keyword in keywords:
+            self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword):
+        state = 0
+        for ch in keyword:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = self.goto[state][ch] = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = nxt
+        if keyword not in self.out[state]:
+            self.out[state] += (keyword,)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def find(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        found = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return frozenset(found)
+
+
+# A registered intent: matches when all keywords of any one clause are present
+# "window" resolves the slots into a (start, end) date range that is passed to
+# the handler; cacheable=False marks answers that depend on more than the ledger.
+class Intent:
+    def __init__(self, name, when, handler, slots=None, window=None, cacheable=True):
+        self.name = name
+        self.clauses = [frozenset((clause,) if isinstance(clause, str) else clause) for clause in when]
+        self.handler = handler
+        self.parameters = frozenset(inspect.signature(handler).parameters)
+        self.slots = slots
+        self.window = window
+        self.cacheable = cacheable
+
+    def matches(self, hits):
+        return any(clause <= hits for clause in self.clauses)
+
+    # Run the handler on the slots plus the context arguments (account, session, ...) it takes
+    def answer(self, slots, context):
+        return self.handler(**slots, **{name: value for name, value in context.items() if name in self.parameters})
+
+    # Extract slot values from the lower-cased query and the original text
+    def extract(self, query, text):
+        if self.slots is None:
+            return {}
+        if callable(self.slots):
+            return self.slots(query, text)
+        return dict(self.slots)
+
+
+# Declarative intent registry compiled into a single-pass keyword matcher
+# Intents are tried in registration order, but only once per distinct set of
+# matched keywords; after that routing is one automaton pass plus a dict lookup.
+class IntentRouter:
+    def __init__(self):
+        self.intents = []
+        self.fallback = None
+        self._automaton = None
+        self._decisions = {}
+
+    # Register an intent; registering a name again replaces it in place
+    # A re-registration with the same keywords (a Streamlit rerun defining the
+    # handlers again) keeps the compiled matcher and its routing decisions.
+    def add(self, name, when, handler, slots=None, window=None, cacheable=True):
+        intent = Intent(name, when, handler, slots, window, cacheable)
+        for i, existing in enumerate(self.intents):
+            if existing.name == name:
+                if existing.clauses == intent.clauses:
+                    existing.__dict__.update(intent.__dict__)
+                    return handler
+                self.intents[i] = intent
+                break
+        else:
+            self.intents.append(intent)
+        self._automaton = None
+        return handler
+
+    # Decorator form of add()
+    def intent(self, name, when, slots=None, window=None, cacheable=True):
+        def register(handler):
+            return self.add(name, when, handler, slots, window, cacheable)
+        return register
+
+    def default(self, handler):
+        self.fallback = Intent("fallback", [], handler)
+        return handler
+
+    def compile(self):
+        keywords = {keyword for intent in self.intents for clause in intent.clauses for keyword in clause}
+        self._automaton = KeywordAutomaton(sorted(keywords))
+        self._decisions = {}
+
+    def route(self, query):
+        if self._automaton is None:
+            self.compile()
+        hits = self._automaton.find(query)
+        decision = self._decisions.get(hits)
+        if decision is None:
+            decision = next((intent for intent in self.intents if intent.matches(hits)), self.fallback)
+            if len(self._decisions) >= DECISION_CACHE_SIZE:
+                self._decisions.clear()
+            self._decisions[hits] = decision
+        return decision
+
+    # Route a query and resolve its slots (plus date window, if any)
+    def resolve(self, text):
+        text = text.strip()
+        query = text.lower()
+        intent = self.route(query)
+        slots = intent.extract(query, text)
+        if intent.window is not None:
+            slots["window"] = intent.window(**slots)
+        return intent, slots
+
+    # Route a query and run its handler with the extracted slots
+    # Extra keyword arguments (e.g. the account) are passed to handlers that take them.
+    # With a cache, answers are memoized on (intent, slots, window, version).
+    def dispatch(self, text, cache=None, version=None, metrics=NO_METRICS, **context):
+        with metrics.span("route"):
+            intent, slots = self.resolve(text)
+        metrics.observe_intent(intent.name)
+        with metrics.span("answer"):
+            if cache is None or not intent.cacheable:
+                return intent.answer(slots, context)
+            key = (intent.name, tuple(sorted(slots.items())), version)
+            return cache.get_or_compute(key, lambda: intent.answer(slots, context))
+
+
+# Slot extractor: text after the last occurrence of a phrase, keeping the
+# user's original casing and dropping trailing punctuation; empty without the phrase
+def text_after(phrase, slot):
+    def extract(query, text):
+        source = text if len(text) == len(query) else query
+        start = query.rfind(phrase)
+        if start < 0:
+            return {slot: ""}
+        return {slot: source[start + len(phrase):].strip().rstrip('?.!')}
+    return extract
+
+
+# Slot extractor: the first word after the first occurrence of a phrase, lower-cased
+def word_after(phrase, slot):
+    def extract(query, text):
+        rest = query.split(phrase, 1)[1] if phrase in query else ""
+        return {slot: rest.split(" ")[0].strip().rstrip('?.!')}
+    return extract
@@ -0,0 +1,353 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from itertools import accumulate, compress, count
+
+from aggregates import LedgerAggregates
+from search import DescriptionIndex
+
+# Day ordinal used for transactions whose date could not be parsed
+INVALID_DAY = 0
+
+# Ledger versions are unique across all stores, so a version alone identifies
+# one state of one ledger (used as a cache key)
+_versions = count(1)
+
+
+# Convert an amount into integer cents
+# Floats (as loaded from JSON) are rounded to the nearest cent; strings and
+# Decimals are parsed exactly, so "1234567890123.45" keeps its last cent.
+def to_cents(amount):
+    if isinstance(amount, float):
+        return round(amount * 100)
+    if isinstance(amount, int):
+        return amount * 100
+    try:
+        value = Decimal(amount)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Invalid amount: {amount!r}") from None
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return int((value * 100).to_integral_value(ROUND_HALF_EVEN))
+
+
+# Convert integer cents back into the float amount stored in account.json
+def from_cents(cents):
+    return cents / 100
+
+
+# Exact Decimal amount of integer cents, for display ("${:.2f}")
+def money(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+# Parse a "YYYY-MM-DD" string into a day ordinal (INVALID_DAY if unparsable)
+def parse_day(date_str):
+    try:
+        if len(date_str) != 10:
+            raise ValueError(date_str)
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return INVALID_DAY
+
+
+# Interned string column: each distinct value is stored once, rows hold codes
+class StringTable:
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    @classmethod
+    def from_values(cls, values):
+        table = cls()
+        for value in values:
+            table.intern(value)
+        return table
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def get(self, value):
+        return self.codes.get(value)
+
+
+# Date-sorted view of a store with prefix sums of income and spend
+# Any [start, end] window is answered with two bisects and two subtractions.
+class DateIndex:
+    def __init__(self, store):
+        rows = sorted(
+            (i for i, day in enumerate(store.days) if day != INVALID_DAY),
+            key=store.days.__getitem__,
+        )
+        self.rows = array("q", rows)
+        self.days = array("i", map(store.days.__getitem__, rows))
+        amounts = list(map(store.cents.__getitem__, rows))
+        self.income_prefix = array("q", accumulate(filter_sign(amounts, 1), initial=0))
+        self.spend_prefix = array("q", accumulate(filter_sign(amounts, -1), initial=0))
+
+    # Index from columns that are already sorted and summed (e.g. read from a file)
+    @classmethod
+    def from_columns(cls, rows, days, income_prefix, spend_prefix):
+        index = cls.__new__(cls)
+        index.rows, index.days = rows, days
+        index.income_prefix, index.spend_prefix = income_prefix, spend_prefix
+        return index
+
+    # Extend with a row whose day is not earlier than the last indexed day
+    def append(self, row, day, cents):
+        self.rows.append(row)
+        self.days.append(day)
+        self.income_prefix.append(self.income_prefix[-1] + (cents if cents > 0 else 0))
+        self.spend_prefix.append(self.spend_prefix[-1] + (-cents if cents < 0 else 0))
+
+    def _bounds(self, start_day, end_day):
+        return bisect_left(self.days, start_day), bisect_right(self.days, end_day)
+
+    def income_between_cents(self, start_day, end_day):
+        lo, hi = self._bounds(start_day, end_day)
+        return self.income_prefix[hi] - self.income_prefix[lo] if lo < hi else 0
+
+    def spending_between_cents(self, start_day, end_day):
+        lo, hi = self._bounds(start_day, end_day)
+        return self.spend_prefix[hi] - self.spend_prefix[lo] if lo < hi else 0
+
+
+# Keep amounts of one sign (1 for income, -1 for spend) as positive values, zero otherwise
+def filter_sign(amounts, sign):
+    if sign > 0:
+        return (c if c > 0 else 0 for c in amounts)
+    return (-c if c < 0 else 0 for c in amounts)
+
+
+# Column-oriented copy of account["transactions"]
+# Dates are day ordinals, amounts are integer cents, strings are interned codes.
+class TransactionStore:
+    def __init__(self):
+        self.days = array("i")
+        self.cents = array("q")
+        self.date_codes = array("i")
+        self.category_codes = array("i")
+        self.description_codes = array("i")
+        # Insertion serial per row: increasing in row order, stable across removals
+        self.serials = array("q")
+        self.dates = StringTable()
+        self.categories = StringTable()
+        self.descriptions = StringTable()
+        # Day ordinal per distinct date string, so each date is parsed only once
+        self._date_days = array("i")
+        self._date_index = None
+        self._next_serial = 0
+        self.aggregates = LedgerAggregates()
+        self.search = DescriptionIndex()
+        self.version = next(_versions)
+
+    # Sequences that carry their own columns (binledger.BinaryTransactions)
+    # build their store in bulk through to_store()
+    @classmethod
+    def from_transactions(cls, transactions):
+        if hasattr(transactions, "to_store"):
+            return transactions.to_store()
+        store = cls()
+        store.extend(transactions)
+        return store
+
+    @classmethod
+    def from_account(cls, account):
+        return cls.from_transactions(account["transactions"])
+
+    def __len__(self):
+        return len(self.cents)
+
+    def append(self, t):
+        date_code = self.dates.intern(t["date"])
+        if date_code == len(self._date_days):
+            day = parse_day(t["date"])
+            if day == INVALID_DAY:
+                print(f"Warning: Could not parse date for transaction: {t}")
+            self._date_days.append(day)
+        day = self._date_days[date_code]
+        cents = to_cents(t["amount"])
+        self.date_codes.append(date_code)
+        self.days.append(day)
+        self.cents.append(cents)
+        category_code = self.categories.intern(t["category"])
+        self.category_codes.append(category_code)
+        description_code = self.descriptions.intern(t["description"])
+        self.description_codes.append(description_code)
+        self.serials.append(self._next_serial)
+        self.aggregates.add(self._next_serial, day, cents, t["category"])
+        self.search.add(self._next_serial, description_code, t["description"], cents)
+        self._next_serial += 1
+        self.version = next(_versions)
+        self._index_appended(day, cents)
+
+    # Remove the i-th row; aggregates are updated in O(1), the date index is rebuilt lazily
+    def remove(self, i):
+        self.aggregates.remove(
+            self.serials[i], self.days[i], self.cents[i], self.categories.values[self.category_codes[i]]
+        )
+        self.search.remove(self.description_codes[i], self.cents[i])
+        for column in (self.days, self.cents, self.date_codes, self.category_codes,
+                       self.description_codes, self.serials):
+            del column[i]
+        self._date_index = None
+        self.version = next(_versions)
+
+    # Row index holding the given serial, or None if it was removed
+    def index_of_serial(self, serial):
+        i = bisect_left(self.serials, serial)
+        if i < len(self.serials) and self.serials[i] == serial:
+            return i
+        return None
+
+    # Keep the date index current: in-order rows are appended, out-of-order rows
+    # drop it so the next range query rebuilds it
+    def _index_appended(self, day, cents):
+        index = self._date_index
+        if index is None or day == INVALID_DAY:
+            return
+        if index.days and day < index.days[-1]:
+            self._date_index = None
+        else:
+            index.append(len(self.days) - 1, day, cents)
+
+    @property
+    def date_index(self):
+        if self._date_index is None:
+            self._date_index = DateIndex(self)
+        return self._date_index
+
+    def extend(self, transactions):
+        for t in transactions:
+            self.append(t)
+
+    # Rebuild the i-th transaction as a plain dict
+    def row(self, i):
+        return {
+            "date": self.dates.values[self.date_codes[i]],
+            "amount": from_cents(self.cents[i]),
+            "description": self.descriptions.values[self.description_codes[i]],
+            "category": self.categories.values[self.category_codes[i]],
+        }
+
+    def to_transactions(self):
+        return [self.row(i) for i in range(len(self))]
+
+    # Category codes whose name matches case-insensitively
+    def category_codes_like(self, name):
+        name = name.lower()
+        return {code for code, value in enumerate(self.categories.values) if value.lower() == name}
+
+    # Full recomputes over the columns; queries read self.aggregates instead and
+    # these back LedgerAggregates.verify. They run inside C iterators (filter/compress/map).
+    def total_income_cents(self):
+        return sum(filter((0).__lt__, self.cents))
+
+    def total_spent_cents(self):
+        return -sum(filter((0).__gt__, self.cents))
+
+    def spending_by_category_cents(self, category):
+        code = self.categories.get(category)
+        if code is None:
+            return 0
+        selected = compress(self.cents, map(code.__eq__, self.category_codes))
+        return -sum(filter((0).__gt__, selected))
+
+    def income_by_category_cents(self, category_name):
+        codes = self.category_codes_like(category_name)
+        if not codes:
+            return 0
+        selected = compress(self.cents, map(codes.__contains__, self.category_codes))
+        return sum(filter((0).__lt__, selected))
+
+    def income_between_cents(self, start_date, end_date):
+        return self.date_index.income_between_cents(start_date.toordinal(), end_date.toordinal())
+
+    def spending_between_cents(self, start_date, end_date):
+        return self.date_index.spending_between_cents(start_date.toordinal(), end_date.toordinal())
+
+    # Row index of the first largest expense, or None if there are no expenses
+    def largest_expense_index(self):
+        serial = self.aggregates.largest_expense_serial()
+        if serial is None:
+            return None
+        return self.index_of_serial(serial)
+
+
+# Append a transaction to a list, keeping its cached store in step
+def append_transaction(transactions, t):
+    transactions.append(t)
+    store_for(transactions)
+
+
+# Remove the i-th transaction from a list, keeping its cached store in step
+def remove_transaction(transactions, i):
+    store = store_for(transactions)
+    if i < 0:
+        i += len(transactions)
+    removed = transactions.pop(i)
+    store.remove(i)
+    return removed
+
+
+# Stores are cached per transactions list so repeated queries reuse the columns
+# Pinned stores (accounts held by an AccountRegistry) are exempt from the LRU.
+STORE_CACHE_SIZE = 8
+_stores = OrderedDict()
+_pinned = {}
+
+
+# Keep the store for a transactions list cached until it is unpinned
+def pin_store(transactions):
+    store = store_for(transactions)
+    _pinned[id(transactions)] = (transactions, store)
+    _stores.pop(id(transactions), None)
+    return store
+
+
+def unpin_store(transactions):
+    _pinned.pop(id(transactions), None)
+
+
+# Get the column store for a transactions list, building or extending it as needed
+# Rows are treated as append-only: new rows at the end are picked up incrementally,
+# anything else (removed rows) triggers a rebuild.
+def store_for(transactions):
+    key = id(transactions)
+    cache = _pinned if key in _pinned else _stores
+    entry = cache.get(key)
+    if entry is not None and entry[0] is transactions:
+        if cache is _stores:
+            _stores.move_to_end(key)
+        store = entry[1]
+        if len(store) < len(transactions):
+            store.extend(transactions[len(store):])
+        elif len(store) > len(transactions):
+            store = TransactionStore.from_transactions(transactions)
+            cache[key] = (transactions, store)
+        return store
+
+    store = TransactionStore.from_transactions(transactions)
+    _stores[key] = (transactions, store)
+    if len(_stores) > STORE_CACHE_SIZE:
+        _stores.popitem(last=False)
+    return store
+
+
+# Rebuild the store for a list whose existing rows were edited in place
+def refresh_store(transactions):
+    store = TransactionStore.from_transactions(transactions)
+    key = id(transactions)
+    cache = _pinned if key in _pinned else _stores
+    cache[key] = (transactions, store)
+    return store
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Number of recent chat turns kept for the debug sidebar
+RECENT_TURNS = 20
+METRIC_PREFIX = "finchat"
+
+# Shared no-op context returned by span()/turn() when metrics are disabled
+_NO_OP = nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # Cumulative (upper bound, count) pairs as Prometheus expects
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self):
+        return {"count": self.count, "sum": self.sum, "buckets": {_le(bound): n for bound, n in self.cumulative()}}
+
+
+# Timing span around one stage of a turn (load, index, route, answer, save)
+class _Span:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics._record_stage(self.stage, time.perf_counter() - self.started)
+
+
+# One chat turn: collects the stage breakdown and the routed intent
+class _Turn:
+    def __init__(self, metrics, account):
+        self.metrics = metrics
+        self.account = account
+        self.intent = None
+        self.stages = {}
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.metrics._local.turn = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics._local.turn = None
+        self.metrics._finish_turn(self, time.perf_counter() - self.started)
+
+
+# Per-stage and per-intent latency metrics for chat turns
+# When disabled, span() and turn() hand back a shared no-op context manager,
+# so instrumented code pays one attribute check per call.
+class Metrics:
+    def __init__(self, enabled=False, recent=RECENT_TURNS):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stage_seconds = {}  # stage -> Histogram
+        self.turn_seconds = {}  # intent -> Histogram
+        self.queries_total = {}  # intent -> count
+        self.recent = deque(maxlen=recent)
+
+    def span(self, stage):
+        if not self.enabled:
+            return _NO_OP
+        return _Span(self, stage)
+
+    # A chat turn, tagged with the account it was for
+    def turn(self, account=None):
+        if not self.enabled:
+            return _NO_OP
+        return _Turn(self, account)
+
+    # Record which intent a query was routed to
+    def observe_intent(self, intent):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.queries_total[intent] = self.queries_total.get(intent, 0) + 1
+        turn = getattr(self._local, "turn", None)
+        if turn is not None:
+            turn.intent = intent
+
+    def _record_stage(self, stage, seconds):
+        with self._lock:
+            histogram = self.stage_seconds.get(stage)
+            if histogram is None:
+                histogram = self.stage_seconds[stage] = Histogram()
+            histogram.observe(seconds)
+        turn = getattr(self._local, "turn", None)
+        if turn is not None:
+            turn.stages[stage] = turn.stages.get(stage, 0.0) + seconds
+
+    def _finish_turn(self, turn, seconds):
+        intent = turn.intent or "unknown"
+        with self._lock:
+            histogram = self.turn_seconds.get(intent)
+            if histogram is None:
+                histogram = self.turn_seconds[intent] = Histogram()
+            histogram.observe(seconds)
+            self.recent.append({
+                "time": time.strftime("%H:%M:%S"),
+                "account": turn.account,
+                "intent": intent,
+                "total_ms": round(seconds * 1000, 3),
+                "stages_ms": {stage: round(value * 1000, 3) for stage, value in turn.stages.items()},
+            })
+
+    # Breakdown of the last turns, newest first; only one account's if given
+    def recent_turns(self, account=None):
+        with self._lock:
+            return [turn for turn in reversed(self.recent) if account is None or turn["account"] == account]
+
+    def reset(self):
+        with self._lock:
+            self.stage_seconds.clear()
+            self.turn_seconds.clear()
+            self.queries_total.clear()
+            self.recent.clear()
+
+    # Aggregates plus the recent turns (only one account's if given)
+    def as_dict(self, account=None):
+        recent = list(reversed(self.recent_turns(account)))
+        with self._lock:
+            return {
+                "queries_total": dict(self.queries_total),
+                "stage_seconds": {stage: h.as_dict() for stage, h in self.stage_seconds.items()},
+                "turn_seconds": {intent: h.as_dict() for intent, h in self.turn_seconds.items()},
+                "recent_turns": recent,
+            }
+
+    def to_json(self, account=None):
+        return json.dumps(self.as_dict(account), indent=4)
+
+    # Prometheus text exposition format
+    def to_prometheus(self):
+        with self._lock:
+            lines = [
+                f"# HELP {METRIC_PREFIX}_queries_total Queries answered, by intent.",
+                f"# TYPE {METRIC_PREFIX}_queries_total counter",
+            ]
+            for intent, count in sorted(self.queries_total.items()):
+                lines.append(f'{METRIC_PREFIX}_queries_total{{intent="{intent}"}} {count}')
+            lines += _histogram_lines("stage_seconds", "Time spent per stage of a chat turn.", "stage", self.stage_seconds)
+            lines += _histogram_lines("turn_seconds", "Total chat turn latency, by intent.", "intent", self.turn_seconds)
+        return "\n".join(lines) + "\n"
+
+
+def _le(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _histogram_lines(name, help_text, label, histograms):
+    metric = f"{METRIC_PREFIX}_{name}"
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{{label}="{key}",le="{_le(bound)}"}} {count}')
+        lines.append(f'{metric}_sum{{{label}="{key}"}} {histogram.sum}')
+        lines.append(f'{metric}_count{{{label}="{key}"}} {histogram.count}')
+    return lines
+
+
+# Process-wide metrics, enabled only by FINCHAT_METRICS=1 in the environment
+# (the app's ?debug=1 sidebar shows them only when this is set)
+metrics = Metrics(enabled=os.environ.get("FINCHAT_METRICS") == "1")
@@ -0,0 +1,71 @@
+import argparse
+import os
+import shutil
+from decimal import Decimal
+
+from ledger import to_cents, from_cents, money
+from persistence import account_file
+
+
+# An amount as stored after migration: a number exact to the cent
+def normalize_amount(amount):
+    return from_cents(to_cents(amount))
+
+
+# Rewrite every amount (and the balance) as an exact two-decimal number
+# Older files can hold float drift such as 30.000000000000004 or amounts saved
+# as strings; both are rounded to the nearest cent. Returns (values changed,
+# total absolute drift removed as a Decimal).
+def migrate_account(account):
+    changed = 0
+    drift = 0
+    for record in [account] + account["transactions"]:
+        key = "balance" if record is account else "amount"
+        value = record[key]
+        normalized = normalize_amount(value)
+        if isinstance(value, str) or value != normalized:
+            changed += 1
+            drift += abs(money(to_cents(value)) - _exact(value))
+            record[key] = normalized
+    return changed, drift
+
+
+# Exact decimal value of a stored amount (a float is taken at its shortest repr)
+def _exact(value):
+    return Decimal(repr(value) if isinstance(value, float) else str(value))
+
+
+# Migrate an account file in place (journal included); unless dry_run is set,
+# the old snapshot is kept as <path>.bak and its journal, which the new
+# snapshot replaces, as <path>.journal.bak
+def migrate_file(path, dry_run=False):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No account file at {path}")
+    handle = account_file(path)
+    account = handle.load()
+    changed, drift = migrate_account(account)
+    if changed and not dry_run:
+        shutil.copyfile(path, path + ".bak")
+        if os.path.exists(handle.journal_path):
+            shutil.copyfile(handle.journal_path, handle.journal_path + ".bak")
+        handle.write_snapshot(account)
+    return changed, drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round every amount in an account file to exact cents.")
+    parser.add_argument("path", nargs="?", default="account.json")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args(argv)
+
+    changed, drift = migrate_file(args.path, args.dry_run)
+    if not changed:
+        print(f"{args.path} is already exact to the cent")
+    elif args.dry_run:
+        print(f"Would normalize {changed} amounts in {args.path} (drift ${drift:.6f})")
+    else:
+        print(f"Normalized {changed} amounts in {args.path} (drift ${drift:.6f}); backup at {args.path}.bak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import copy
+import json
+import os
+
+# Journal lines are compacted into a fresh snapshot once there are this many
+COMPACT_EVERY = 1000
+
+
+# A JSON snapshot (account.json) plus an append-only JSONL journal beside it
+# Journal records are {"at": i, "append": transaction} and {"balance": value}.
+# "at" is the row index the transaction lands on, so replay skips rows that a
+# snapshot already contains (e.g. after a crash between snapshot and truncation).
+# Persisted rows are treated as immutable: edits to existing rows or removals
+# are only picked up by a full snapshot (save(..., force=True) or compaction).
+class AccountFile:
+    def __init__(self, path, default=None, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.default = default
+        self.compact_every = compact_every
+        self.journal_records = 0
+        self._transactions = None  # the list object last persisted
+        self._count = 0
+        self._balance = None
+        self._on_disk = False
+        self.disk_signature = None
+
+    # (mtime, size) of the snapshot and journal; changes when anyone writes them
+    def signature(self):
+        return tuple(_stat(path) for path in (self.path, self.journal_path))
+
+    # True if the files were modified by someone else since we last read/wrote them
+    def changed_on_disk(self):
+        return self.signature() != self.disk_signature
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                account = json.load(f)
+            self._on_disk = True
+        else:
+            account = copy.deepcopy(self.default)
+            self._on_disk = False
+        self.journal_records = self._replay(account)
+        self._remember(account)
+        self.disk_signature = self.signature()
+        return account
+
+    # Apply journal records to a loaded snapshot; returns the number applied
+    # A torn final write (an unreadable or unterminated last line) is cut off
+    # the file, so later appends start on a clean line instead of extending it.
+    def _replay(self, account):
+        if not os.path.exists(self.journal_path):
+            return 0
+        records = 0
+        good_bytes = 0
+        transactions = account["transactions"]
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final write; everything before it is intact
+                    print(f"Warning: Ignoring unreadable journal line in {self.journal_path}")
+                    break
+                good_bytes += len(line)
+                records += 1
+                if "append" in record:
+                    if record["at"] == len(transactions):
+                        transactions.append(record["append"])
+                elif "balance" in record:
+                    account["balance"] = record["balance"]
+        if good_bytes < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, good_bytes)
+        return records
+
+    def _remember(self, account):
+        self._transactions = account["transactions"]
+        self._count = len(account["transactions"])
+        self._balance = account["balance"]
+
+    # Drop the references to the last persisted account; the next save writes a snapshot
+    def forget(self):
+        self._transactions = None
+        self._count = 0
+        self._balance = None
+        self._on_disk = False
+
+    def is_dirty(self, account):
+        return (
+            not self._on_disk
+            or account["transactions"] is not self._transactions
+            or len(account["transactions"]) != self._count
+            or account["balance"] != self._balance
+        )
+
+    # Persist changes since the last load/save; returns False when nothing was written
+    def save(self, account, force=False):
+        if not force and not self.is_dirty(account):
+            return False
+        transactions = account["transactions"]
+        appended_only = (
+            self._on_disk
+            and transactions is self._transactions
+            and len(transactions) >= self._count
+        )
+        # Compact instead of journaling when the journal would reach its limit
+        pending = len(transactions) - self._count + (account["balance"] != self._balance)
+        if force or not appended_only or self.journal_records + pending >= self.compact_every:
+            self.write_snapshot(account)
+            return True
+
+        records = [{"at": i, "append": transactions[i]} for i in range(self._count, len(transactions))]
+        if account["balance"] != self._balance:
+            records.append({"balance": account["balance"]})
+        self._append_journal(records)
+        self._remember(account)
+        self.disk_signature = self.signature()
+        return True
+
+    def _append_journal(self, records):
+        with open(self.journal_path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += len(records)
+
+    # Write the full account atomically and start a new, empty journal
+    def write_snapshot(self, account):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(account, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_records = 0
+        self._on_disk = True
+        self._remember(account)
+        self.disk_signature = self.signature()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+_account_files = {}
+
+
+# Get the AccountFile for a path, shared so dirty-tracking survives across calls
+def account_file(path, default=None):
+    handle = _account_files.get(path)
+    if handle is None:
+        handle = _account_files[path] = AccountFile(path, default)
+    elif default is not None:
+        handle.default = default
+    return handle
+
+
+# Release the shared AccountFile for a path once its account is unloaded, so
+# no handle keeps the account's rows alive
+def release_account_file(path):
+    handle = _account_files.pop(path, None)
+    if handle is not None:
+        handle.forget()
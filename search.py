@@ -0,0 +1,160 @@
+import re
+from array import array
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Query words ignored when searching ("spent at the Grocery Store")
+STOP_WORDS = {"a", "an", "and", "at", "from", "in", "of", "on", "the", "to", "with"}
+# Query terms shorter than this only match exactly or by prefix
+FUZZY_MIN_LENGTH = 4
+# Memoized term expansions; reset when new terms are indexed or past this size
+EXPANSION_CACHE_SIZE = 4096
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# Distinct search terms of a query, without stop words (unless that leaves none)
+def query_terms(query):
+    terms = list(dict.fromkeys(tokenize(query)))
+    return [term for term in terms if term not in STOP_WORDS] or terms
+
+
+# Edit distance allowed for a fuzzy match of a query term
+def fuzzy_limit(term):
+    if len(term) < FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+# Edit distance of a and b is at most limit, counting an adjacent swap as one
+# edit ("uebr" -> "uber"); row-wise with early exit
+def within_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+
+# Inverted index over the distinct descriptions of a TransactionStore
+# Postings map each term to the description codes containing it; descriptions
+# are interned, so a row only touches the running totals unless its description
+# is new. Totals are [income cents, spend cents, rows, spend rows], kept per description
+# and per term and updated in O(1) per row. Row serials per description back
+# "transactions from X"; removed rows stay listed and are skipped by callers.
+class DescriptionIndex:
+    def __init__(self):
+        self.postings = {}  # term -> set of description codes
+        self.terms = []  # sorted distinct terms, for prefix lookups
+        self.code_terms = []  # description code -> tuple of its terms
+        self.totals = []  # description code -> [income, spend, rows, spend rows]
+        self.term_totals = {}  # term -> [income, spend, rows, spend rows]
+        self.row_serials = []  # description code -> array of row serials
+        self._expansions = {}
+
+    def _add_description(self, code, description):
+        while len(self.code_terms) <= code:
+            self.code_terms.append(())
+            self.totals.append([0, 0, 0, 0])
+            self.row_serials.append(array("q"))
+        terms = tuple(dict.fromkeys(tokenize(description)))
+        self.code_terms[code] = terms
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = set()
+                self.term_totals[term] = [0, 0, 0, 0]
+                insort(self.terms, term)
+                self._expansions.clear()
+            postings.add(code)
+
+    def _apply(self, code, cents, sign):
+        income = cents * sign if cents > 0 else 0
+        spend = -cents * sign if cents < 0 else 0
+        spends = sign if cents < 0 else 0
+        totals = self.totals[code]
+        totals[0] += income
+        totals[1] += spend
+        totals[2] += sign
+        totals[3] += spends
+        for term in self.code_terms[code]:
+            totals = self.term_totals[term]
+            totals[0] += income
+            totals[1] += spend
+            totals[2] += sign
+            totals[3] += spends
+
+    def add(self, serial, code, description, cents):
+        if code >= len(self.code_terms):
+            self._add_description(code, description)
+        self.row_serials[code].append(serial)
+        self._apply(code, cents, 1)
+
+    def remove(self, code, cents):
+        self._apply(code, cents, -1)
+
+    # Indexed terms a query term stands for: itself or the terms it prefixes,
+    # else terms within a small edit distance ("coffe" -> "coffee", "uebr" -> "uber")
+    def expand(self, term):
+        expansion = self._expansions.get(term)
+        if expansion is None:
+            start = bisect_left(self.terms, term)
+            end = bisect_left(self.terms, term + "\uffff", start)
+            expansion = tuple(self.terms[start:end])
+            limit = fuzzy_limit(term)
+            if not expansion and limit:
+                expansion = tuple(t for t in self.terms if within_distance(term, t, limit))
+            if len(self._expansions) >= EXPANSION_CACHE_SIZE:
+                self._expansions.clear()
+            self._expansions[term] = expansion
+        return expansion
+
+    # Description codes matching every term of a query
+    def match(self, query):
+        matches = []
+        for term in query_terms(query):
+            codes = set()
+            for indexed in self.expand(term):
+                codes |= self.postings[indexed]
+            if not codes:
+                return set()
+            matches.append(codes)
+        if not matches:
+            return set()
+        matches.sort(key=len)
+        result = set(matches[0])
+        for codes in matches[1:]:
+            result &= codes
+        return result
+
+    # (income cents, spend cents, rows, spend rows) over every row whose description matches
+    # A one-term query that names an indexed term exactly reads that term's totals.
+    def totals_for(self, query):
+        terms = query_terms(query)
+        if len(terms) == 1 and self.expand(terms[0]) == (terms[0],):
+            return tuple(self.term_totals[terms[0]])
+        income = spend = rows = spend_rows = 0
+        for code in self.match(query):
+            totals = self.totals[code]
+            income += totals[0]
+            spend += totals[1]
+            rows += totals[2]
+            spend_rows += totals[3]
+        return income, spend, rows, spend_rows
+
+    # Serials of the rows (including removed ones) with the given descriptions
+    def serials_for(self, codes):
+        for code in codes:
+            yield from self.row_serials[code]
@@ -0,0 +1,156 @@
+import gc
+import json
+import os
+import tempfile
+import unittest
+import weakref
+from unittest.mock import patch
+
+import ledger
+import persistence
+from accounts import AccountRegistry, DEFAULT_ACCOUNT_ID, TRANSACTION_BYTES, estimate_account_bytes
+from binledger import BinaryStore, BinaryTransactions, write_ledger
+
+DEFAULT = {
+    "balance": 500.0,
+    "transactions": [
+        {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    ],
+}
+
+
+class TestAccountRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.default_path = os.path.join(self.tmpdir.name, "account.json")
+        self.accounts_dir = os.path.join(self.tmpdir.name, "accounts")
+        self.registry = AccountRegistry(self.default_path, DEFAULT, accounts_dir=self.accounts_dir)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_account(self, account_id, rows):
+        os.makedirs(self.accounts_dir, exist_ok=True)
+        transactions = [dict(DEFAULT["transactions"][0]) for _ in range(rows)]
+        with open(os.path.join(self.accounts_dir, f"{account_id}.json"), "w") as f:
+            json.dump({"balance": 1.0, "transactions": transactions}, f)
+
+    def test_default_account_uses_default_path_and_template(self):
+        account = self.registry.get(DEFAULT_ACCOUNT_ID)
+        self.assertEqual(account, DEFAULT)
+        self.assertIs(self.registry.get(DEFAULT_ACCOUNT_ID), account)
+
+    def test_new_accounts_start_empty(self):
+        self.assertEqual(self.registry.get("alice"), {"balance": 0.0, "transactions": []})
+
+    def test_accounts_are_isolated(self):
+        self.write_account("alice", 2)
+        self.write_account("bob", 3)
+        self.assertEqual(len(self.registry.get("alice")["transactions"]), 2)
+        self.assertEqual(len(self.registry.get("bob")["transactions"]), 3)
+        self.assertEqual(len(self.registry), 2)
+
+    def test_rejects_path_like_ids(self):
+        for account_id in ("../etc/passwd", "a/b", ""):
+            with self.assertRaises(ValueError):
+                self.registry.get(account_id)
+
+    def test_evicts_least_recently_used_over_budget(self):
+        for account_id in ("a", "b", "c"):
+            self.write_account(account_id, 10)
+        size = estimate_account_bytes({"transactions": [None] * 10})
+        self.registry.memory_budget = 2 * size
+        self.registry.get("a")
+        self.registry.get("b")
+        self.registry.get("a")  # "b" becomes least recently used
+        self.registry.get("c")
+        self.assertIn("a", self.registry)
+        self.assertNotIn("b", self.registry)
+        self.assertIn("c", self.registry)
+        self.assertLessEqual(self.registry.memory_usage(), 2 * size)
+
+    def test_eviction_saves_and_unpins(self):
+        account = self.registry.get("alice")
+        account["transactions"].append(dict(DEFAULT["transactions"][0]))
+        self.assertIn(id(account["transactions"]), ledger._pinned)
+        self.registry.evict("alice")
+        self.assertNotIn(id(account["transactions"]), ledger._pinned)
+        with open(os.path.join(self.accounts_dir, "alice.json")) as f:
+            self.assertEqual(len(json.load(f)["transactions"]), 1)
+
+    def test_binary_ledger_is_served_read_only(self):
+        os.makedirs(self.accounts_dir)
+        ledger_path = os.path.join(self.accounts_dir, "carol.bin")
+        write_ledger(DEFAULT, ledger_path)
+        with open(ledger_path, "rb") as f:
+            data = f.read()
+        account = self.registry.get("carol")
+        self.assertEqual(self.registry.path_for("carol"), ledger_path)
+        self.assertEqual(account["balance"], DEFAULT["balance"])
+        # Rows stay in the file, read one at a time; the column store comes from its sections
+        self.assertIsInstance(account["transactions"], BinaryTransactions)
+        self.assertEqual(list(account["transactions"]), DEFAULT["transactions"])
+        self.assertIsInstance(ledger.store_for(account["transactions"]), BinaryStore)
+        account["balance"] = 0.0
+        with patch("builtins.print") as warn:
+            self.assertFalse(self.registry.save("carol"))
+        warn.assert_called_once()
+        with patch("builtins.print"):
+            self.registry.evict("carol")
+        # Dropping the account unmaps the ledger
+        with self.assertRaises(ValueError):
+            account["transactions"][0]
+        with open(ledger_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertFalse(os.path.exists(os.path.join(self.accounts_dir, "carol.json")))
+        self.assertEqual(self.registry.get("carol")["balance"], DEFAULT["balance"])
+
+    def test_eviction_releases_the_file_handle(self):
+        self.write_account("alice", 3)
+        self.registry.get("alice")
+        path = self.registry.path_for("alice")
+        handle = weakref.ref(persistence._account_files[path])
+        self.registry.evict("alice")
+        gc.collect()
+        self.assertIsNone(handle())
+        self.assertNotIn(path, persistence._account_files)
+        self.assertEqual(len(self.registry.get("alice")["transactions"]), 3)
+
+    def test_repeated_get_does_not_reload(self):
+        account = self.registry.get(DEFAULT_ACCOUNT_ID)
+        self.registry.save(DEFAULT_ACCOUNT_ID)
+        self.assertIs(self.registry.get(DEFAULT_ACCOUNT_ID), account)
+
+    def test_own_writes_do_not_trigger_reload(self):
+        account = self.registry.get("alice")
+        account["transactions"].append(dict(DEFAULT["transactions"][0]))
+        self.registry.save("alice")
+        account["transactions"].append(dict(DEFAULT["transactions"][0]))
+        self.registry.save("alice")  # journal append
+        self.assertIs(self.registry.get("alice"), account)
+
+    def test_external_edit_is_picked_up(self):
+        self.write_account("alice", 1)
+        account = self.registry.get("alice")
+        self.write_account("alice", 4)
+        path = os.path.join(self.accounts_dir, "alice.json")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        reloaded = self.registry.get("alice")
+        self.assertIsNot(reloaded, account)
+        self.assertEqual(len(reloaded["transactions"]), 4)
+
+    def test_lock_is_per_account(self):
+        self.assertIs(self.registry.lock("alice"), self.registry.lock("alice"))
+        self.assertIsNot(self.registry.lock("alice"), self.registry.lock("bob"))
+
+    def test_oversized_account_is_kept_while_in_use(self):
+        self.write_account("big", 10)
+        self.registry.memory_budget = TRANSACTION_BYTES
+        self.registry.get("big")
+        self.assertIn("big", self.registry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import ledger
+from ledger import TransactionStore, store_for, append_transaction, remove_transaction
+from aggregates import LedgerAggregates
+
+TRANSACTIONS = [
+    {"date": "2025-04-28", "amount": -10.00, "description": "Snacks", "category": "food"},
+    {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-03", "amount": 200.00, "description": "Salary Deposit", "category": "salary"},
+    {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+    {"date": "2025-05-06", "amount": -50.00, "description": "Dinner", "category": "food"},
+    {"date": "2025-05-10", "amount": 50.00, "description": "Bonus", "category": "Salary"},
+]
+
+
+class TestLedgerAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [t.copy() for t in TRANSACTIONS]
+        self.store = TransactionStore.from_transactions(self.transactions)
+        self.aggregates = self.store.aggregates
+
+    def test_totals(self):
+        self.assertEqual(self.aggregates.total_income, 25000)
+        self.assertEqual(self.aggregates.total_spent, 12500)
+        self.assertEqual(self.aggregates.spending_by_category("food"), 11000)
+        self.assertEqual(self.aggregates.spending_by_category("missing"), 0)
+        self.assertEqual(self.aggregates.income_by_category_like("SALARY"), 25000)
+
+    def test_month_buckets(self):
+        self.assertEqual(self.aggregates.month_totals(2025, 4), (0, 1000))
+        self.assertEqual(self.aggregates.month_totals(2025, 5), (25000, 11500))
+        self.assertEqual(self.aggregates.month_totals(2024, 5), (0, 0))
+
+    def test_largest_expense_prefers_earliest_row(self):
+        self.assertEqual(self.store.largest_expense_index(), 1)
+
+    def test_remove_updates_aggregates(self):
+        self.store.remove(1)
+        self.assertEqual(self.aggregates.spending_by_category("food"), 6000)
+        self.assertEqual(self.aggregates.month_totals(2025, 5), (25000, 6500))
+        # The tied expense further down becomes the largest
+        self.assertEqual(self.store.largest_expense_index(), 3)
+        self.assertEqual(self.aggregates.verify(self.store), [])
+
+    def test_append_updates_aggregates(self):
+        self.store.append({"date": "2025-06-01", "amount": -99.00, "description": "Shoes", "category": "shopping"})
+        self.assertEqual(self.aggregates.month_totals(2025, 6), (0, 9900))
+        self.assertEqual(self.store.largest_expense_index(), 6)
+        self.assertEqual(self.aggregates.verify(self.store), [])
+
+    def test_verify_detects_drift(self):
+        self.aggregates.total_spent += 1
+        self.aggregates.by_category["food"][1] += 1
+        self.assertEqual(self.aggregates.verify(self.store), ["total_spent", "by_category"])
+
+    def test_from_store_matches_incremental(self):
+        rebuilt = LedgerAggregates.from_store(self.store)
+        self.assertEqual(rebuilt.by_category, self.aggregates.by_category)
+        self.assertEqual(rebuilt.by_month, self.aggregates.by_month)
+
+
+class TestTransactionListHelpers(unittest.TestCase):
+
+    def setUp(self):
+        ledger._stores.clear()
+        self.transactions = [t.copy() for t in TRANSACTIONS]
+        self.store = store_for(self.transactions)
+
+    def test_append_and_remove_keep_store_in_step(self):
+        append_transaction(self.transactions, {"date": "2025-05-20", "amount": -5.00, "description": "Tea", "category": "food"})
+        removed = remove_transaction(self.transactions, 0)
+        self.assertEqual(removed["description"], "Snacks")
+        self.assertIs(store_for(self.transactions), self.store)
+        self.assertEqual(self.store.to_transactions(), self.transactions)
+        self.assertEqual(self.store.aggregates.verify(self.store), [])
+
+    def test_remove_negative_index(self):
+        remove_transaction(self.transactions, -1)
+        self.assertEqual(self.store.aggregates.income_by_category_like("salary"), 20000)
+
+
+if __name__ == '__main__':
+    unittest.main()
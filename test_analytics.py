@@ -0,0 +1,104 @@
+import time
+import unittest
+from datetime import date
+
+from analytics import ALL, DailySeries, month_bounds, months_to_date, series_for
+from ledger import TransactionStore, remove_transaction
+
+TRANSACTIONS = [
+    {"date": "2025-03-10", "amount": 190.00, "description": "Salary", "category": "salary"},
+    {"date": "2025-04-20", "amount": -25.00, "description": "Books", "category": "education"},
+    {"date": "2025-04-28", "amount": -10.00, "description": "Snacks", "category": "Food"},
+    {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-01", "amount": -20.00, "description": "Grocery Store", "category": "food"},
+    {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+    {"date": "someday", "amount": -99.00, "description": "Unknown", "category": "food"},
+]
+
+
+def brute_force_spend(start, end, category=None):
+    return sum(
+        round(-t["amount"] * 100) for t in TRANSACTIONS
+        if t["amount"] < 0 and t["date"] != "someday" and start.isoformat() <= t["date"] <= end.isoformat()
+        and (category is None or t["category"].lower() == category)
+    )
+
+
+class TestDailySeries(unittest.TestCase):
+
+    def setUp(self):
+        self.series = DailySeries(TransactionStore.from_transactions(TRANSACTIONS))
+
+    def test_windows_match_brute_force(self):
+        days = [date(2025, 3, 1), date(2025, 3, 10), date(2025, 4, 20), date(2025, 4, 30), date(2025, 5, 1),
+                date(2025, 5, 5), date(2025, 6, 1)]
+        for start in days:
+            for end in days:
+                for category in (None, "food", "transport", "rent"):
+                    self.assertEqual(self.series.spending_between(start, end, category),
+                                     brute_force_spend(start, end, category), (start, end, category))
+
+    def test_income_and_first_day(self):
+        self.assertEqual(self.series.income_between(date(2025, 1, 1), date(2025, 12, 31)), 19000)
+        self.assertEqual(self.series.income_between(date(2025, 3, 11), date(2025, 12, 31), "salary"), 0)
+        self.assertEqual(self.series.first_day, date(2025, 3, 10))
+
+    def test_periods_and_rolling(self):
+        self.assertEqual(self.series.spending_by_period(months_to_date(date(2025, 5, 15)), "food"), [0, 0, 0, 1000, 7000])
+        self.assertEqual(self.series.rolling_spending(7, [date(2025, 5, 1), date(2025, 5, 7)]), [8000, 8500])
+
+    def test_empty_ledger(self):
+        series = DailySeries(TransactionStore.from_transactions([]))
+        self.assertIsNone(series.first_day)
+        self.assertEqual(series.spending_between(date(2025, 1, 1), date(2025, 12, 31)), 0)
+
+    def test_far_apart_dates_stay_sparse(self):
+        transactions = [
+            {"date": "0001-01-01", "amount": -1.00, "description": "Old", "category": "food"},
+            {"date": "0025-05-01", "amount": 2.00, "description": "Refund", "category": "food"},
+            {"date": "9999-12-31", "amount": -3.00, "description": "New", "category": "rent"},
+        ]
+        started = time.perf_counter()
+        series = DailySeries(TransactionStore.from_transactions(transactions))
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(len(series.spend[ALL].days), 2)
+        self.assertEqual(series.first_day, date(1, 1, 1))
+        self.assertEqual(series.spending_between(date(1, 1, 1), date(9999, 12, 31)), 400)
+        self.assertEqual(series.spending_between(date(2, 1, 1), date(9999, 12, 30), "food"), 0)
+        self.assertEqual(series.income_between(date(25, 5, 1), date(25, 5, 1), "food"), 200)
+
+    def test_series_for_extends_on_append(self):
+        transactions = [dict(t) for t in TRANSACTIONS]
+        first = series_for(transactions)
+        self.assertIs(series_for(transactions), first)
+        transactions.append({"date": "2025-05-06", "amount": -5.00, "description": "Tea", "category": "food"})
+        self.assertIs(series_for(transactions), first)
+        self.assertEqual(first.spending_between(date(2025, 5, 6), date(2025, 5, 6), "food"), 500)
+        # An earlier date cannot be appended in place: the series is rebuilt
+        transactions.append({"date": "2025-04-01", "amount": -7.00, "description": "Tea", "category": "food"})
+        rebuilt = series_for(transactions)
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.spending_between(date(2025, 4, 1), date(2025, 5, 6), "food"), 500 + 700 + 7000 + 1000)
+
+    def test_series_for_rebuilds_after_removal(self):
+        transactions = [dict(t) for t in TRANSACTIONS]
+        series_for(transactions)
+        remove_transaction(transactions, 3)  # Coffee Shop, -50.00 on 2025-05-01
+        transactions.append({"date": "2025-05-06", "amount": -5.00, "description": "Tea", "category": "food"})
+        self.assertEqual(series_for(transactions).spending_between(date(2025, 5, 1), date(2025, 5, 6), "food"), 2500)
+
+
+class TestMonths(unittest.TestCase):
+
+    def test_month_bounds(self):
+        self.assertEqual(month_bounds(2024, 2), (date(2024, 2, 1), date(2024, 2, 29)))
+        self.assertEqual(month_bounds(2025, 12), (date(2025, 12, 1), date(2025, 12, 31)))
+
+    def test_months_to_date(self):
+        months = months_to_date(date(2025, 3, 2))
+        self.assertEqual(len(months), 3)
+        self.assertEqual(months[-1], (date(2025, 3, 1), date(2025, 3, 31)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import api
+import chat
+from accounts import AccountRegistry
+from cache import ResponseCache
+
+
+def new_account():
+    return {
+        "balance": 250.0,
+        "transactions": [
+            {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+            {"date": "2025-05-02", "amount": -20.00, "description": "Grocery Store", "category": "food"},
+            {"date": "2025-05-03", "amount": 200.00, "description": "Salary Deposit", "category": "salary"},
+            {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+        ],
+    }
+
+
+class TestAnswerMany(unittest.TestCase):
+
+    def setUp(self):
+        self.account = new_account()
+        patcher = patch("chat.response_cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_process_query(self):
+        queries = [
+            "What's my balance?",
+            "How much did I spend on food?",
+            "how much did i spend on FOOD",
+            "How much income from salary?",
+            "Tell me a joke",
+            "What's my balance?",
+        ]
+        expected = [chat.process_query(q, self.account) for q in queries]
+        chat.response_cache.clear()
+        self.assertEqual(api.answer_many(queries, self.account), expected)
+
+    def test_same_intent_and_slots_computed_once(self):
+        calls = []
+        original = chat.get_spending_by_category
+
+        def counting(category, account=None):
+            calls.append(category)
+            return original(category, account)
+
+        with patch("chat.get_spending_by_category", counting):
+            answers = api.answer_many(
+                ["spend on food?", "How much did I spend on food?", "food spent", "spend on transport"],
+                self.account,
+            )
+        self.assertEqual(sorted(calls), ["food", "transport"])
+        self.assertEqual(answers[:3], ["You spent $70.00 on food."] * 3)
+        self.assertEqual(answers[3], "You spent $15.00 on transport.")
+
+    def test_balance_snapshot(self):
+        self.assertEqual(api.answer_many(["balance"], self.account), ["Your balance is $250.00."])
+        self.account["balance"] = 10.0
+        self.assertEqual(api.answer_many(["balance"], self.account), ["Your balance is $10.00."])
+
+    def test_show_more_pages_within_a_batch_only(self):
+        answers = api.answer_many(["show transactions", "show more"], self.account)
+        self.assertTrue(answers[0].startswith("Recent transactions:"))
+        self.assertEqual(answers[1], "No more transactions.")
+        self.assertEqual(api.answer_many(["show more"], self.account),
+                         ["Ask for your transactions first (e.g., 'show transactions')."])
+
+    def test_show_more_pages_on_in_input_order(self):
+        self.account["transactions"] += [
+            {"date": f"2025-06-{day:02d}", "amount": -1.0, "description": f"Shop {day}", "category": "food"}
+            for day in range(1, 8)
+        ]
+        answers = api.answer_many(["show transactions", "show more", "show more"], self.account)
+        self.assertTrue(answers[1].startswith("Earlier transactions:\n2025-06-02: Shop 2"))
+        self.assertTrue(answers[2].startswith("Earlier transactions:\n2025-05-01: Coffee Shop"))
+        answers = api.answer_many(["show more", "show transactions", "show more"], self.account)
+        self.assertEqual(answers[0], "Ask for your transactions first (e.g., 'show transactions').")
+        self.assertTrue(answers[2].startswith("Earlier transactions:\n2025-06-02: Shop 2"))
+
+    def test_empty_batch(self):
+        self.assertEqual(api.answer_many([], self.account), [])
+
+    def test_import_loads_no_ui(self):
+        code = "import sys, api; print('streamlit' in sys.modules, 'main' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), ["False", "False"])
+
+    def test_async_wrapper(self):
+        answers = asyncio.run(api.answer_many_async(["balance", "spend on food"], self.account))
+        self.assertEqual(answers, ["Your balance is $250.00.", "You spent $70.00 on food."])
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = AccountRegistry("unused.json", new_account(), accounts_dir="unused")
+        self.registry.get("default")
+        patcher = patch("chat.registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server = api.make_server(port=0)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def post(self, data):
+        request = urllib.request.Request(f"{self.url}/query", json.dumps(data).encode(), method="POST")
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+
+    def test_query(self):
+        result = self.post({"queries": ["What's my balance?", "spend on food"]})
+        self.assertEqual(result["answers"], ["Your balance is $250.00.", "You spent $70.00 on food."])
+
+    def test_bad_requests(self):
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            self.post({"account": "../etc", "queries": ["balance"]})
+        self.assertEqual(cm.exception.code, 400)
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            self.post({"queries": [1, 2]})
+        self.assertEqual(cm.exception.code, 400)
+
+    def test_unexpected_error_is_a_json_500(self):
+        with patch("api.answer_for_account", side_effect=RuntimeError("boom")), patch("traceback.print_exc"):
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                self.post({"queries": ["balance"]})
+        self.assertEqual(cm.exception.code, 500)
+        self.assertEqual(json.load(cm.exception), {"error": "internal error"})
+
+    def test_health_and_metrics(self):
+        with urllib.request.urlopen(f"{self.url}/health") as response:
+            self.assertEqual(response.read(), b"ok")
+        with urllib.request.urlopen(f"{self.url}/metrics") as response:
+            self.assertIn(b"finchat_queries_total", response.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from datetime import date
+
+import bench
+import chat
+
+
+class TestGenerateLedger(unittest.TestCase):
+
+    def test_is_seeded(self):
+        self.assertEqual(bench.generate_ledger(200, seed=1), bench.generate_ledger(200, seed=1))
+        self.assertNotEqual(bench.generate_ledger(200, seed=1), bench.generate_ledger(200, seed=2))
+
+    def test_shape(self):
+        end = date(2025, 5, 15)
+        account = bench.generate_ledger(2000, end=end, days=90)
+        transactions = account["transactions"]
+        self.assertEqual(len(transactions), 2000)
+        dates = [t["date"] for t in transactions]
+        self.assertEqual(dates, sorted(dates))
+        self.assertLessEqual(dates[-1], end.isoformat())
+        self.assertGreaterEqual(dates[0], "2025-02-15")
+        self.assertTrue(all(t["amount"] < 0 for t in transactions if t["category"] in bench.SPENDING_PROFILE))
+        self.assertTrue(all(t["amount"] > 0 for t in transactions if t["category"] in bench.INCOME_PROFILE))
+        self.assertGreater(sum(t["category"] == "food" for t in transactions), 500)
+
+
+class TestBenchQueries(unittest.TestCase):
+
+    def test_every_intent_has_a_query(self):
+        covered = {chat.router.route(query.strip().lower()).name for query in bench.BENCH_QUERIES.values()}
+        self.assertEqual({intent.name for intent in chat.router.intents} - covered, set())
+
+
+class TestBenchMoney(unittest.TestCase):
+
+    def test_money_measurements(self):
+        results = bench.bench_money(bench.generate_ledger(500, seed=3))
+        self.assertEqual(set(results), {
+            "money:float_spent", "money:decimal_spent", "money:cents_column_spent",
+            "money:cents_running_spent", "money:float_drift_cents",
+        })
+        self.assertLess(results["money:float_drift_cents"], 1)
+
+
+class TestBenchCategorize(unittest.TestCase):
+
+    def test_categorize_measurements(self):
+        results = bench.bench_categorize(bench.generate_ledger(200, seed=3))
+        self.assertEqual(set(results), {"categorize:default_rules", "categorize:large_rule_set"})
+
+
+class TestStatistics(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(bench.percentile(samples, 0.5), 51)
+        self.assertEqual(bench.percentile(samples, 0.99), 99)
+        self.assertEqual(bench.percentile([7], 0.99), 7)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"1000": {"a": {"p50_us": 10.0}, "b": {"p50_us": 10.0}, "memory:x": 5}}}
+        current = {"results": {"1000": {"a": {"p50_us": 20.0}, "b": {"p50_us": 11.0}, "memory:x": 50}}}
+        self.assertEqual(bench.compare(baseline, current), [("1000", "a", 10.0, 20.0, 2.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from binledger import BinaryLedger, write_ledger, import_json, export_json
+import chat
+from binledger import BinaryStore
+from ledger import TransactionStore
+
+ACCOUNT = {
+    "balance": 1000.0,
+    "transactions": [
+        {"date": "2025-05-04", "amount": -30.00, "description": "Restaurant", "category": "food"},
+        {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+        {"date": "2025-05-03", "amount": 200.00, "description": "Salary Deposit", "category": "salary"},
+        {"date": "2025-04-15", "amount": 120.00, "description": "Freelance Payment", "category": "Freelance"},
+        {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+        {"date": "2025-05-06", "amount": -50.00, "description": "Café ☕", "category": "food"},
+        {"date": "2025-05-07", "amount": -4.25, "description": "Coffee Shop", "category": "food"},
+    ],
+}
+
+
+class TestBinaryLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "account.ledger")
+        write_ledger(ACCOUNT, self.path)
+        self.ledger = BinaryLedger(self.path)
+        self.store = TransactionStore.from_account(ACCOUNT)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(self.ledger.to_account(), ACCOUNT)
+        self.assertEqual(list(self.ledger.transactions()), ACCOUNT["transactions"])
+        self.assertEqual(self.ledger.transactions()[-1], ACCOUNT["transactions"][-1])
+
+    def test_matches_column_store(self):
+        self.assertEqual(self.ledger.total_income_cents(), self.store.total_income_cents())
+        self.assertEqual(self.ledger.total_spent_cents(), self.store.total_spent_cents())
+        self.assertEqual(self.ledger.spending_by_category_cents("food"), 13425)
+        self.assertEqual(self.ledger.spending_by_category_cents("missing"), 0)
+        self.assertEqual(self.ledger.income_by_category_cents("freelance"), 12000)
+        self.assertEqual(self.ledger.largest_expense_index(), 1)
+
+    def test_date_ranges(self):
+        self.assertEqual(self.ledger.spending_between_cents(date(2025, 5, 1), date(2025, 5, 4)), 8000)
+        self.assertEqual(self.ledger.income_between_cents(date(2025, 4, 1), date(2025, 4, 30)), 12000)
+        self.assertEqual(self.ledger.income_between_cents(date(2024, 1, 1), date(2024, 12, 31)), 0)
+
+    def test_descriptions_are_shared(self):
+        self.assertEqual(self.ledger.description_offsets[1], self.ledger.description_offsets[6])
+
+    def test_store_from_sections_matches_column_store(self):
+        store = self.ledger.transactions().to_store()
+        self.assertIsInstance(store, BinaryStore)
+        self.assertEqual(store.to_transactions(), self.store.to_transactions())
+        self.assertEqual(store.aggregates.verify(store), [])
+        self.assertEqual(store.aggregates.by_month, self.store.aggregates.by_month)
+        self.assertEqual(store.largest_expense_index(), self.store.largest_expense_index())
+        self.assertEqual(list(store.date_index.rows), list(self.store.date_index.rows))
+        self.assertEqual(store.search.totals_for("coffee"), self.store.search.totals_for("coffee"))
+
+    def test_queries_match_the_json_account(self):
+        account = {"balance": self.ledger.balance, "transactions": self.ledger.transactions()}
+        for query in ("balance", "total income", "how much did I spend on food?", "income from freelance",
+                      "largest expense", "how much did I spend in May 2025?", "spent at coffee",
+                      "show transactions", "transactions from cafe", "compare April 2025 vs May 2025"):
+            self.assertEqual(chat.process_query(query, account, {}), chat.process_query(query, ACCOUNT, {}), query)
+
+    def test_empty_ledger(self):
+        path = os.path.join(self.tmpdir.name, "empty.ledger")
+        write_ledger({"balance": 0.0, "transactions": []}, path)
+        with BinaryLedger(path) as ledger:
+            self.assertEqual(len(ledger), 0)
+            self.assertEqual(ledger.total_spent_cents(), 0)
+            self.assertIsNone(ledger.largest_expense_index())
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmpdir.name, "account.json")
+        with open(path, "w") as f:
+            json.dump(ACCOUNT, f, indent=4)
+        with self.assertRaises(ValueError):
+            BinaryLedger(path)
+
+    def test_rejects_unparsable_dates(self):
+        account = {"balance": 0.0, "transactions": [{"date": "soon", "amount": 1.0, "description": "x", "category": "y"}]}
+        with self.assertRaises(ValueError):
+            write_ledger(account, os.path.join(self.tmpdir.name, "bad.ledger"))
+
+    def test_json_converters(self):
+        json_path = os.path.join(self.tmpdir.name, "account.json")
+        ledger_path = os.path.join(self.tmpdir.name, "copy.ledger")
+        with open(json_path, "w") as f:
+            json.dump(ACCOUNT, f)
+        self.assertEqual(import_json(json_path, ledger_path), 7)
+        out_path = os.path.join(self.tmpdir.name, "out.json")
+        export_json(ledger_path, out_path)
+        with open(out_path) as f:
+            self.assertEqual(json.load(f), ACCOUNT)
+
+
+if __name__ == '__main__':
+    unittest.main()
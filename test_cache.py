@@ -0,0 +1,41 @@
+import unittest
+
+from cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "answer")
+        self.assertEqual(cache.get("a"), "answer")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 1, "maxsize": cache.maxsize})
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", "3")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+
+    def test_get_or_compute(self):
+        cache = ResponseCache()
+        calls = []
+        compute = lambda: calls.append(1) or "answer"
+        self.assertEqual(cache.get_or_compute("k", compute), "answer")
+        self.assertEqual(cache.get_or_compute("k", compute), "answer")
+        self.assertEqual(len(calls), 1)
+
+    def test_clear(self):
+        cache = ResponseCache()
+        cache.put("a", "1")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import time
+import tempfile
+import unittest
+
+import ledger
+from categorizer import Categorizer, Rule, categorize_account, load_rules, UNCATEGORIZED
+
+
+class TestCategorizer(unittest.TestCase):
+
+    def setUp(self):
+        self.categorizer = Categorizer()
+
+    def test_keywords(self):
+        self.assertEqual(self.categorizer.categorize("STARBUCKS #1234", -4.50), "food")
+        self.assertEqual(self.categorizer.categorize("Uber Trip", -12.00), "transport")
+        self.assertEqual(self.categorizer.categorize("Snacks", -2.00), "food")  # plural
+
+    def test_keywords_match_whole_words(self):
+        self.assertIsNone(self.categorizer.categorize("Business lunch", -30.00))
+        self.assertIsNone(self.categorizer.categorize("Current account fee", -1.00))
+
+    def test_rule_order_and_amount_ranges(self):
+        # "salary" only applies to money coming in
+        self.assertEqual(self.categorizer.categorize("Salary Deposit", 2000.00), "salary")
+        self.assertIsNone(self.categorizer.categorize("Salary advance repayment", -50.00))
+        # Amount-only fallback rule
+        self.assertEqual(self.categorizer.categorize("Transfer from savings", 10.00), "income")
+
+    def test_regex_rules(self):
+        categorizer = Categorizer([Rule("cash", pattern=r"\batm\s+\d+"), Rule("other", pattern=".")])
+        self.assertEqual(categorizer.categorize("ATM 0042 withdrawal", -20.00), "cash")
+        self.assertEqual(categorizer.categorize("Treatment", -20.00), "other")
+
+    def test_phrases_and_plurals(self):
+        self.assertEqual(self.categorizer.categorize("Monthly WATER BILLS", -40.00), "utilities")
+        self.assertIsNone(self.categorizer.categorize("Water fountain bill", -40.00))
+        self.assertEqual(self.categorizer.categorize("McDonald's #12", -9.00), "food")
+        self.assertEqual(self.categorizer.categorize("Buses to town", -3.00), "transport")
+
+    def test_same_matches_as_word_boundary_regexes(self):
+        # Each keyword behaves like \bkeyword(?:e?s)?\b
+        descriptions = ["Coffee beans", "coffeeshop", "Pizzas 4U", "Book club", "Booking.com", "Rented car",
+                        "TRAIN TICKETS", "Internet-Provider", "shell-oil", "cafés", "ATM 1", "Stream"]
+        for rule in self.categorizer.rules:
+            if not rule.keywords:
+                continue
+            regex = re.compile("|".join(rf"\b{re.escape(k)}(?:e?s)?\b" for k in rule.keywords), re.IGNORECASE)
+            for description in descriptions:
+                with self.subTest(category=rule.category, description=description):
+                    hit = self.categorizer.rules.index(rule) in self.categorizer.candidates(description)
+                    self.assertEqual(hit, bool(regex.search(description)))
+
+    def test_large_rule_set_with_unique_descriptions(self):
+        rules = [Rule(f"rule{i}", keywords=(f"merchant{i}", f"corner store {i}")) for i in range(1000)]
+        categorizer = Categorizer(rules)
+        rows = [
+            {"date": "2025-05-01", "amount": -1.00, "description": f"POS CORNER STORE {i % 1200} REF{i:09d}", "category": ""}
+            for i in range(20000)
+        ]
+        started = time.perf_counter()
+        changed = categorizer.categorize_batch(rows)
+        # Lookups do not scan the rules: well under a second here, not minutes
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertEqual(changed, sum(1 for i in range(20000) if i % 1200 < 1000))
+        self.assertEqual(rows[1234]["category"], "rule34")
+        self.assertEqual(rows[1199]["category"], "")
+
+    def test_results_are_cached_per_description(self):
+        self.categorizer.categorize("Coffee Shop", -1.00)
+        self.categorizer.categorize("Coffee Shop", -2.00)
+        self.assertEqual(len(self.categorizer._candidates), 1)
+
+    def test_batch_only_fills_missing_categories(self):
+        rows = [
+            {"date": "2025-05-01", "amount": -5.00, "description": "Coffee Shop", "category": UNCATEGORIZED},
+            {"date": "2025-05-01", "amount": -5.00, "description": "Coffee Shop", "category": "treats"},
+            {"date": "2025-05-01", "amount": -5.00, "description": "Mystery", "category": ""},
+        ]
+        self.assertEqual(self.categorizer.categorize_batch(rows), 1)
+        self.assertEqual([t["category"] for t in rows], ["food", "treats", ""])
+        self.assertEqual(self.categorizer.categorize_batch(rows, overwrite=True), 1)
+        self.assertEqual(rows[1]["category"], "food")
+
+
+class TestCategorizeAccount(unittest.TestCase):
+
+    def test_refreshes_store(self):
+        account = {"balance": 0.0, "transactions": [
+            {"date": "2025-05-01", "amount": -5.00, "description": "Coffee Shop", "category": UNCATEGORIZED},
+        ]}
+        store = ledger.store_for(account["transactions"])
+        self.assertEqual(store.aggregates.spending_by_category("food"), 0)
+        self.assertEqual(categorize_account(account), 1)
+        self.assertEqual(ledger.store_for(account["transactions"]).aggregates.spending_by_category("food"), 500)
+
+    def test_load_rules(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rules.json")
+            with open(path, "w") as f:
+                json.dump([{"category": "pets", "keywords": ["vet"], "max_amount": 0}], f)
+            categorizer = Categorizer(load_rules(path))
+        self.assertEqual(categorizer.categorize("City Vet", -80.00), "pets")
+        self.assertIsNone(categorizer.categorize("City Vet", 80.00))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,351 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import date, datetime, timedelta
+
+import chat
+
+# Define a fixed "today" for consistent testing of relative date queries
+FIXED_TODAY = date(2025, 5, 15)
+
+MOCK_TRANSACTIONS_BASE = [
+    # Expenses
+    {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-02", "amount": -20.00, "description": "Grocery Store", "category": "food"},
+    {"date": "2025-05-04", "amount": -30.00, "description": "Restaurant", "category": "food"},
+    {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+    {"date": "2025-04-20", "amount": -25.00, "description": "Books", "category": "education"},
+    {"date": "2025-04-28", "amount": -10.00, "description": "Snacks", "category": "food"},
+
+    # Income
+    {"date": "2025-05-03", "amount": 200.00, "description": "Salary Deposit", "category": "salary"},
+    {"date": "2025-04-15", "amount": 120.00, "description": "Freelance Payment", "category": "freelance"},
+    {"date": "2025-03-10", "amount": 190.00, "description": "Old Salary Deposit", "category": "salary"}, # Older income
+
+    # Mixed Category (hypothetical, if a category could have in/out)
+    {"date": "2025-05-10", "amount": 50.00, "description": "Project A Bonus", "category": "projectA"},
+    {"date": "2025-05-11", "amount": -10.00, "description": "Project A Software", "category": "projectA"},
+]
+
+class TestFinancialFunctions(unittest.TestCase):
+
+    def setUp(self):
+        # Make a deep copy of transactions for each test to avoid modification issues
+        self.mock_transactions = [t.copy() for t in MOCK_TRANSACTIONS_BASE]
+        # It's good practice to also patch chat.account if functions directly use it.
+        # For functions that accept transactions as an argument, this is less critical for those specific functions.
+        self.patcher_account = patch('chat.account', {'transactions': self.mock_transactions, 'balance': 1000.0})
+        self.mocked_account = self.patcher_account.start()
+        chat.account['transactions'] = self.mock_transactions # Ensure it's updated for process_query
+
+    def tearDown(self):
+        self.patcher_account.stop()
+
+    # --- Tests for get_spending_by_date_range ---
+    def test_spending_range_includes_some(self):
+        start_date = date(2025, 5, 1)
+        end_date = date(2025, 5, 4)
+        # Expected: -50 (Coffee) + -20 (Grocery) + -30 (Restaurant) = -100. Function returns positive sum.
+        self.assertEqual(chat.get_spending_by_date_range(self.mock_transactions, start_date, end_date), 100.00)
+
+    def test_spending_range_includes_none(self):
+        start_date = date(2025, 1, 1)
+        end_date = date(2025, 1, 31)
+        self.assertEqual(chat.get_spending_by_date_range(self.mock_transactions, start_date, end_date), 0.00)
+
+    def test_spending_range_empty_transactions(self):
+        start_date = date(2025, 5, 1)
+        end_date = date(2025, 5, 4)
+        self.assertEqual(chat.get_spending_by_date_range([], start_date, end_date), 0.00)
+
+    def test_spending_range_all_transactions(self):
+        start_date = date(2025, 1, 1)
+        end_date = date(2025, 12, 31)
+        # Expected: 50+20+30+15+25+10+10 = 160
+        self.assertEqual(chat.get_spending_by_date_range(self.mock_transactions, start_date, end_date), 160.00)
+
+    # --- Tests for get_income_by_date_range ---
+    def test_income_range_includes_some(self):
+        start_date = date(2025, 4, 1)
+        end_date = date(2025, 4, 30)
+        # Expected: 120 (Freelance)
+        self.assertEqual(chat.get_income_by_date_range(self.mock_transactions, start_date, end_date), 120.00)
+
+    def test_income_range_includes_none(self):
+        start_date = date(2024, 1, 1)
+        end_date = date(2024, 12, 31) # Range with no income transactions
+        self.assertEqual(chat.get_income_by_date_range(self.mock_transactions, start_date, end_date), 0.00)
+
+    def test_income_range_empty_transactions(self):
+        start_date = date(2025, 5, 1)
+        end_date = date(2025, 5, 4)
+        self.assertEqual(chat.get_income_by_date_range([], start_date, end_date), 0.00)
+
+    def test_income_range_all_transactions(self):
+        start_date = date(2025, 1, 1)
+        end_date = date(2025, 12, 31)
+        # Expected: 200 (Salary) + 120 (Freelance) + 190 (Old Salary) + 50 (Project A Bonus) = 560
+        self.assertEqual(chat.get_income_by_date_range(self.mock_transactions, start_date, end_date), 560.00)
+
+
+    # --- Tests for get_total_income ---
+    def test_total_income_with_income(self):
+        # Expected: 200 + 120 + 190 + 50 = 560
+        self.assertEqual(chat.get_total_income(self.mock_transactions), 560.00)
+
+    def test_total_income_no_income(self):
+        expenses_only = [t for t in self.mock_transactions if t['amount'] < 0]
+        self.assertEqual(chat.get_total_income(expenses_only), 0.00)
+
+    def test_total_income_empty_transactions(self):
+        self.assertEqual(chat.get_total_income([]), 0.00)
+
+    # --- Tests for get_income_by_category ---
+    def test_income_category_exists(self):
+        # Expected for "salary": 200 (Salary) + 190 (Old Salary) = 390
+        self.assertEqual(chat.get_income_by_category("salary"), 390.00)
+        self.assertEqual(chat.get_income_by_category("freelance"), 120.00)
+
+    def test_income_category_case_insensitivity(self):
+        self.assertEqual(chat.get_income_by_category("SALary"), 390.00)
+        self.assertEqual(chat.get_income_by_category("FrEeLanCe"), 120.00)
+
+
+    def test_income_category_not_exists(self):
+        self.assertEqual(chat.get_income_by_category("nonexistent"), 0.00)
+
+    def test_income_category_mixed_types(self):
+        # Category "projectA" has +50 and -10. Should only sum income.
+        self.assertEqual(chat.get_income_by_category("projectA"), 50.00)
+        # Category "food" only has expenses.
+        self.assertEqual(chat.get_income_by_category("food"), 0.00)
+
+
+    def test_income_category_empty_transactions(self):
+        # Temporarily use empty list for this specific chat.account.transactions
+        original_transactions = chat.account['transactions']
+        chat.account['transactions'] = []
+        self.assertEqual(chat.get_income_by_category("salary"), 0.00)
+        chat.account['transactions'] = original_transactions # Restore
+
+
+class TestProcessQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_transactions = [t.copy() for t in MOCK_TRANSACTIONS_BASE]
+        # Patch chat.account for process_query tests
+        self.patcher_account = patch('chat.account', {'transactions': self.mock_transactions, 'balance': 1000.0})
+        self.mocked_account = self.patcher_account.start()
+        chat.account['transactions'] = self.mock_transactions # Ensure it's updated
+
+        # Patch date/datetime objects for date-sensitive queries
+        self.patcher_date_today = patch('chat.date')
+        self.mock_date = self.patcher_date_today.start()
+        self.mock_date.today.return_value = FIXED_TODAY
+
+        self.patcher_datetime_now = patch('chat.datetime')
+        self.mock_datetime = self.patcher_datetime_now.start()
+        self.mock_datetime.now.return_value = MagicMock(year=FIXED_TODAY.year, month=FIXED_TODAY.month, day=FIXED_TODAY.day)
+        self.mock_datetime.strptime = datetime.strptime # Keep original strptime
+
+        self.patcher_session = patch('chat.default_session', {})
+        self.patcher_session.start()
+
+    def tearDown(self):
+        self.patcher_account.stop()
+        self.patcher_date_today.stop()
+        self.patcher_datetime_now.stop()
+        self.patcher_session.stop()
+
+    def test_query_spending_last_week(self):
+        # FIXED_TODAY is 2025-05-15 (Thursday)
+        # Last week: Monday 2025-05-05 to Sunday 2025-05-11
+        # Expenses: Bus Ticket (-15 on 05-05), Project A Software (-10 on 05-11) = 25
+        expected_start = FIXED_TODAY - timedelta(days=FIXED_TODAY.weekday() + 7) # 2025-05-05
+        expected_end = FIXED_TODAY - timedelta(days=FIXED_TODAY.weekday() + 1)   # 2025-05-11
+        response = chat.process_query("how much did I spend last week?")
+        self.assertIn("You spent $25.00 last week", response)
+        self.assertIn(f"(from {expected_start.strftime('%Y-%m-%d')} to {expected_end.strftime('%Y-%m-%d')})", response)
+
+    def test_query_spending_in_month_april(self):
+        # Expenses in April 2025: Books (-25 on 04-20), Snacks (-10 on 04-28) = 35
+        # Year is FIXED_TODAY.year = 2025
+        response = chat.process_query("what were my expenses in April?")
+        self.assertIn("You spent $35.00 in April 2025", response)
+        self.assertIn("(from 2025-04-01 to 2025-04-30)", response)
+
+    def test_query_spending_in_month_may(self):
+        # Expenses in May 2025: Coffee (-50), Grocery (-20), Restaurant (-30), Bus (-15), Project A Software (-10) = 125
+        response = chat.process_query("what were my expenses in may?") # Test lowercase month
+        self.assertIn("You spent $125.00 in May 2025", response)
+        self.assertIn("(from 2025-05-01 to 2025-05-31)", response)
+
+    def test_query_spending_in_month_with_year(self):
+        response = chat.process_query("what did I spend in March 2024")
+        self.assertIn("You spent $0.00 in March 2024 (from 2024-03-01 to 2024-03-31)", response)
+        response = chat.process_query("what were my expenses in April 2025?")
+        self.assertIn("You spent $35.00 in April 2025", response)
+        self.assertTrue(chat.process_query("what did I spend in March 0000").startswith("Could not determine the month"))
+
+    def test_query_spending_per_month(self):
+        # Food: Snacks (-10 on 04-28); Coffee, Grocery, Restaurant in May = 100
+        response = chat.process_query("spending on food per month this year")
+        self.assertIn("Spending on food per month in 2025:", response)
+        self.assertIn("March: $0.00\nApril: $10.00\nMay: $100.00\nTotal: $110.00", response)
+        self.assertNotIn("June", response)
+
+    def test_query_compare_months(self):
+        # April: 25 + 10 = 35, May: 125
+        response = chat.process_query("compare April vs May")
+        self.assertEqual(response, "You spent $35.00 in April 2025 and $125.00 in May 2025: $90.00 more (+257%) in May 2025.")
+
+    def test_query_rolling_spend(self):
+        # 2025-04-16 to 2025-05-15: 25 + 10 + 125 = 160; nothing in the 30 days before
+        response = chat.process_query("30-day rolling spend")
+        self.assertEqual(response, "You spent $160.00 in the last 30 days (from 2025-04-16 to 2025-05-15), $5.33 per day. The 30 days before: $0.00.")
+
+    def test_query_analytics_out_of_range_inputs(self):
+        self.assertEqual(chat.process_query("0-day rolling spend"),
+                         "Please choose a window of 1 to 3650 days (e.g., '30-day rolling spend').")
+        self.assertEqual(chat.process_query("rolling spend for 100000000 days"),
+                         "Please choose a window of 1 to 3650 days (e.g., '30-day rolling spend').")
+        self.assertTrue(chat.process_query("3650-day rolling spend").startswith("You spent $160.00 in the last 3650 days"))
+        self.assertEqual(chat.process_query("spending per month in 0000"),
+                         "Please name a year between 1 and 9999 (e.g., 'spending per month in 2024').")
+        self.assertTrue(chat.process_query("spending per month in 0001").startswith("Spending per month in 1:"))
+        self.assertTrue(chat.process_query("compare March 0000 vs April").startswith("Please use years between 1 and 9999"))
+
+    def test_query_average_weekly_category(self):
+        # Transport: 15 over the 67 days since the first transaction (2025-03-10)
+        response = chat.process_query("average weekly transport")
+        self.assertEqual(response, "You spend $1.57 per week on transport on average (over 9.6 weeks since 2025-03-10).")
+
+    def test_query_income_last_month(self):
+        # FIXED_TODAY is 2025-05-15. Last month is April 2025.
+        # Income in April 2025: Freelance Payment (120.00 on 04-15)
+        response = chat.process_query("what was my income last month?")
+        self.assertIn("Your income last month (April 2025) was $120.00", response)
+        self.assertIn("(from 2025-04-01 to 2025-04-30)", response)
+
+    def test_query_total_income(self):
+        # Total income: 200 + 120 + 190 + 50 = 560
+        response = chat.process_query("how much income did I receive in total?")
+        self.assertEqual(response, "Your total income is $560.00.")
+        response_variant = chat.process_query("total income")
+        self.assertEqual(response_variant, "Your total income is $560.00.")
+
+
+    def test_query_show_income_transactions(self):
+        response = chat.process_query("show my income transactions")
+        self.assertIn("Income transactions:", response)
+        self.assertIn("2025-05-10: Project A Bonus ($+50.00, projectA)", response) # Most recent income in mock
+        self.assertIn("2025-05-03: Salary Deposit ($+200.00, salary)", response)
+        self.assertIn("2025-04-15: Freelance Payment ($+120.00, freelance)", response)
+        self.assertIn("2025-03-10: Old Salary Deposit ($+190.00, salary)", response)
+        self.assertNotIn("Coffee Shop", response) # Expense
+
+    def test_query_history_shows_most_recent(self):
+        response = chat.process_query("show transactions")
+        lines = response.split("\n")
+        self.assertEqual(lines[0], "Recent transactions:")
+        self.assertEqual(lines[1], "2025-05-11: Project A Software ($-10.00, projectA)")
+        self.assertEqual([line[:10] for line in lines[1:6]], ["2025-05-11", "2025-05-10", "2025-05-05", "2025-05-04", "2025-05-03"])
+        self.assertEqual(lines[6], "Say 'show more' for earlier transactions.")
+
+    def test_query_history_show_more(self):
+        self.assertEqual(chat.process_query("show more"), "Ask for your transactions first (e.g., 'show transactions').")
+        chat.process_query("show transactions")
+        response = chat.process_query("show more")
+        self.assertTrue(response.startswith("Earlier transactions:\n2025-05-02: Grocery Store"))
+        self.assertIn("2025-04-15: Freelance Payment", response)
+        last = chat.process_query("show more transactions")
+        self.assertEqual(last, "Earlier transactions:\n2025-03-10: Old Salary Deposit ($+190.00, salary)")
+        self.assertEqual(chat.process_query("show more"), "No more transactions.")
+
+    def test_query_show_more_is_per_session(self):
+        alice, bob = {}, {}
+        chat.process_query("show transactions", session=alice)
+        self.assertEqual(chat.process_query("show more", session=bob), "Ask for your transactions first (e.g., 'show transactions').")
+        chat.process_query("show income transactions", session=bob)
+        self.assertTrue(chat.process_query("show more", session=alice).startswith("Earlier transactions:\n2025-05-02: Grocery Store"))
+        self.assertEqual(chat.process_query("show more", session=bob), "No more transactions.")
+
+    def test_query_spent_at_merchant(self):
+        self.assertEqual(chat.process_query("How much did I spend at Coffee Shop?"), "You spent $50.00 at Coffee Shop (1 transaction).")
+        self.assertEqual(chat.process_query("how much did I spend at project"),
+                         "You spent $10.00 at project (1 transaction). Matched: Project A Bonus, Project A Software.")
+        self.assertEqual(chat.process_query("spent at Grocry"), "You spent $20.00 at Grocry (1 transaction). Matched: Grocery Store.")
+        self.assertEqual(chat.process_query("spent at Nowhere"), "No transactions found matching 'Nowhere'.")
+        self.assertEqual(chat.process_query("how much have I spent at?"),
+                         "Please name a merchant (e.g., 'how much did I spend at Coffee Shop?').")
+        self.assertEqual(chat.process_query("spent at salary"),
+                         "You spent $0.00 at salary (0 transactions). Matched: Old Salary Deposit, Salary Deposit.")
+
+    def test_query_merchant_transactions(self):
+        expected = "Transactions matching 'salary':\n2025-05-03: Salary Deposit ($+200.00, salary)\n2025-03-10: Old Salary Deposit ($+190.00, salary)"
+        self.assertEqual(chat.process_query("show transactions from salary"), expected)
+        self.assertEqual(chat.process_query("Show Bus transactions"),
+                         "Transactions matching 'Bus':\n2025-05-05: Bus Ticket ($-15.00, transport)")
+        self.assertTrue(chat.process_query("show my recent transactions").startswith("Recent transactions:"))
+
+    def test_query_history_phrasings_without_merchant(self):
+        for query in ["what are my transactions?", "Can you list my transactions?", "give me my transaction history",
+                      "how many transactions do I have", "pull up transactions"]:
+            with self.subTest(query=query):
+                self.assertTrue(chat.process_query(query).startswith("Recent transactions:"))
+        response = chat.process_query("please show me recent income transactions")
+        self.assertTrue(response.startswith("Income transactions:"))
+
+    def test_query_income_from_category_salary(self):
+        # Income from salary: 200 + 190 = 390
+        response = chat.process_query("how much income from salary?")
+        self.assertEqual(response, "You received $390.00 as income from salary.")
+        response_case = chat.process_query("income from SALARY") # Test case insensitivity of query
+        self.assertEqual(response_case, "You received $390.00 as income from SALARY.")
+
+
+    def test_query_income_from_category_freelance(self):
+        response = chat.process_query("how much income from freelance?")
+        self.assertEqual(response, "You received $120.00 as income from freelance.")
+
+    def test_query_income_from_category_nonexistent(self):
+        response = chat.process_query("how much income from unicorn breeding?")
+        self.assertEqual(response, "No income found from unicorn breeding or 'unicorn breeding' is not an income category.")
+
+    def test_query_income_from_category_food(self): # food only has expenses
+        response = chat.process_query("how much income from food?")
+        self.assertEqual(response, "No income found from food or 'food' is not an income category.")
+
+    def test_query_responses_are_cached(self):
+        hits = chat.response_cache.hits
+        first = chat.process_query("how much did I spend on food?")
+        self.assertEqual(chat.process_query("How much did I spend on food?"), first)
+        self.assertEqual(chat.response_cache.hits, hits + 1)
+
+    def test_query_cache_invalidated_by_new_transaction(self):
+        self.assertEqual(chat.process_query("how much did I spend on food?"), "You spent $110.00 on food.")
+        chat.account['transactions'].append({"date": "2025-05-12", "amount": -5.00, "description": "Tea", "category": "food"})
+        self.assertEqual(chat.process_query("how much did I spend on food?"), "You spent $115.00 on food.")
+
+    def test_query_cache_keys_on_resolved_window(self):
+        self.assertIn("You spent $25.00 last week", chat.process_query("how much did I spend last week?"))
+        # A week later "last week" is a different window and must not reuse the answer
+        self.mock_date.today.return_value = FIXED_TODAY + timedelta(days=7)
+        self.assertIn("You spent $0.00 last week", chat.process_query("how much did I spend last week?"))
+
+    def test_query_explicit_account(self):
+        other = {'balance': 42.0, 'transactions': [
+            {"date": "2025-05-01", "amount": -7.00, "description": "Tea", "category": "food"},
+        ]}
+        self.assertEqual(chat.process_query("what's my balance", other), "Your balance is $42.00.")
+        self.assertEqual(chat.process_query("how much did I spend on food?", other), "You spent $7.00 on food.")
+        # The default account is untouched and not served from the other account's cache entry
+        self.assertEqual(chat.process_query("how much did I spend on food?"), "You spent $110.00 on food.")
+
+    def test_query_balance_is_not_cached(self):
+        self.assertEqual(chat.process_query("balance"), "Your balance is $1000.00.")
+        chat.account['balance'] = 900.0
+        self.assertEqual(chat.process_query("balance"), "Your balance is $900.00.")
+
+
+if __name__ == '__main__':
+    unittest.main()
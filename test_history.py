@@ -0,0 +1,120 @@
+import unittest
+from datetime import date
+
+from history import HistoryFilter, INCOME, EXPENSE, history_page, first_page, next_page, decode_cursor
+from ledger import append_transaction, remove_transaction
+
+
+def make_transactions():
+    transactions = []
+    for day in range(1, 21):
+        transactions.append({"date": f"2025-05-{day:02d}", "amount": -float(day), "description": f"Shop {day}", "category": "food" if day % 2 else "transport"})
+        transactions.append({"date": f"2025-05-{day:02d}", "amount": 100.0 + day, "description": f"Pay {day}", "category": "salary"})
+    return transactions
+
+
+def brute_force(transactions, keep):
+    indexed = [(t["date"], i, t) for i, t in enumerate(transactions) if keep(t)]
+    return [t for _, _, t in sorted(indexed, key=lambda x: (x[0], x[1]), reverse=True)]
+
+
+def all_pages(transactions, history_filter=None, limit=3):
+    rows, cursor = [], None
+    while True:
+        page = history_page(transactions, history_filter, limit, cursor)
+        rows.extend(page.rows)
+        cursor = page.next_cursor
+        if cursor is None:
+            return rows
+
+
+class TestHistoryPage(unittest.TestCase):
+
+    def test_most_recent_first(self):
+        transactions = make_transactions()
+        page = history_page(transactions, limit=3)
+        self.assertEqual([t["description"] for t in page], ["Pay 20", "Shop 20", "Pay 19"])
+        self.assertIsNotNone(page.next_cursor)
+
+    def test_pages_cover_everything_once(self):
+        transactions = make_transactions()
+        self.assertEqual(all_pages(transactions), brute_force(transactions, lambda t: True))
+
+    def test_filters(self):
+        transactions = make_transactions()
+        cases = [
+            (HistoryFilter(sign=INCOME), lambda t: t["amount"] > 0),
+            (HistoryFilter(sign=EXPENSE, category="FOOD"), lambda t: t["amount"] < 0 and t["category"] == "food"),
+            (HistoryFilter(start=date(2025, 5, 3), end=date(2025, 5, 7)), lambda t: "2025-05-03" <= t["date"] <= "2025-05-07"),
+            (HistoryFilter(text="shop 1"), lambda t: t["description"].startswith("Shop 1")),
+            (HistoryFilter(category="rent"), lambda t: False),
+            # Rare merchant: served from the postings
+            (HistoryFilter(merchant="shop 7"), lambda t: t["description"] == "Shop 7"),
+            (HistoryFilter(merchant="shop 7", end=date(2025, 5, 6)), lambda t: False),
+            # Common merchant: served by walking the date index
+            (HistoryFilter(merchant="pay"), lambda t: t["description"].startswith("Pay")),
+            (HistoryFilter(merchant="shp", sign=INCOME), lambda t: False),
+        ]
+        for history_filter, keep in cases:
+            self.assertEqual(all_pages(transactions, history_filter, limit=4), brute_force(transactions, keep))
+
+    def test_merchant_postings_with_cursor_and_removals(self):
+        transactions = make_transactions()
+        for day in (3, 9, 15):
+            append_transaction(transactions, {"date": f"2025-05-{day:02d}", "amount": -1.0, "description": "Rare Cafe", "category": "food"})
+        remove_transaction(transactions, len(transactions) - 2)
+        page = history_page(transactions, HistoryFilter(merchant="rare cafe"), limit=1)
+        self.assertEqual([t["date"] for t in page], ["2025-05-15"])
+        following = history_page(transactions, HistoryFilter(merchant="rare"), limit=5, cursor=page.next_cursor)
+        self.assertEqual([t["date"] for t in following], ["2025-05-03"])
+        self.assertIsNone(following.next_cursor)
+
+    def test_cursor_survives_appends_and_removals(self):
+        transactions = make_transactions()
+        page = history_page(transactions, limit=5)
+        append_transaction(transactions, {"date": "2025-05-21", "amount": -1.0, "description": "New", "category": "food"})
+        remove_transaction(transactions, 0)
+        following = history_page(transactions, limit=2, cursor=page.next_cursor)
+        self.assertEqual([t["description"] for t in following], ["Shop 18", "Pay 17"])
+
+    def test_unsorted_and_invalid_dates(self):
+        transactions = [
+            {"date": "2025-05-03", "amount": -3.0, "description": "c", "category": "x"},
+            {"date": "2025-05-01", "amount": -1.0, "description": "a", "category": "x"},
+            {"date": "not a date", "amount": -9.0, "description": "?", "category": "x"},
+            {"date": "2025-05-02", "amount": -2.0, "description": "b", "category": "x"},
+        ]
+        self.assertEqual([t["description"] for t in history_page(transactions)], ["c", "b", "a"])
+
+    def test_bad_cursor(self):
+        with self.assertRaises(ValueError):
+            history_page(make_transactions(), cursor="nope")
+        self.assertEqual(decode_cursor("739000:5"), (739000, 5))
+
+
+class TestShowMore(unittest.TestCase):
+
+    def test_next_page_follows_first_page(self):
+        transactions = make_transactions()
+        session = {}
+        self.assertIsNone(next_page(transactions, session))
+        first = first_page(transactions, session, HistoryFilter(sign=INCOME), limit=15)
+        second = next_page(transactions, session, limit=15)
+        self.assertEqual(len(first) + len(second), 20)
+        self.assertTrue(all(t["amount"] > 0 for t in second))
+        self.assertEqual(len(next_page(transactions, session)), 0)
+
+    def test_sessions_page_independently(self):
+        transactions = make_transactions()
+        alice, bob = {}, {}
+        first_page(transactions, alice, HistoryFilter(sign=INCOME), limit=15)
+        bob_first = first_page(transactions, bob, limit=15)
+        self.assertTrue(all(t["amount"] > 0 for t in next_page(transactions, alice, limit=15)))
+        bob_second = next_page(transactions, bob, limit=15)
+        self.assertEqual(len(bob_second), 15)
+        self.assertFalse(set(t["description"] for t in bob_first) & set(t["description"] for t in bob_second))
+        self.assertIsNone(next_page(make_transactions(), alice))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from importer import (
+    import_into, import_file, normalize_date, normalize_cents, resolve_fields, detect_format, UNCATEGORIZED,
+)
+
+CSV_EXPORT = """Date,Description,Amount,Category
+2025-05-01,Coffee Shop,-50.00,food
+05/06/2025,Bookshop,"-1,020.50",
+2025-05-07,Refund,(3.00),shopping
+2025-05-07,Refund,(3.00),shopping
+not a date,Broken,-1.00,food
+2025-05-08,Salary,$2000,salary
+"""
+
+OFX_EXPORT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250509120000[-5:EST]
+<TRNAMT>-12.34
+<NAME>UBER TRIP
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20250510</DTPOSTED><TRNAMT>100.00</TRNAMT><NAME>ACME PAYROLL</NAME></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def new_account():
+    return {
+        "balance": 100.0,
+        "transactions": [
+            {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+        ],
+    }
+
+
+class TestNormalization(unittest.TestCase):
+
+    def test_dates(self):
+        self.assertEqual(normalize_date("2025-05-01"), "2025-05-01")
+        self.assertEqual(normalize_date("05/01/2025"), "2025-05-01")
+        self.assertEqual(normalize_date("01.05.2025"), "2025-05-01")
+        self.assertEqual(normalize_date("20250501093000.000[-5:EST]"), "2025-05-01")
+        with self.assertRaises(ValueError):
+            normalize_date("yesterday")
+
+    def test_amounts(self):
+        self.assertEqual(normalize_cents("$1,234.50"), 123450)
+        self.assertEqual(normalize_cents("(12.00)"), -1200)
+        self.assertEqual(normalize_cents("-3"), -300)
+        self.assertEqual(normalize_cents(-20.1), -2010)
+
+    def test_field_aliases(self):
+        fields = resolve_fields(["Posted Date", "Payee", "Debit", "Credit"])
+        self.assertEqual(fields["date"], "Posted Date")
+        self.assertEqual(fields["description"], "Payee")
+        self.assertIsNone(fields["amount"])
+        with self.assertRaises(ValueError):
+            resolve_fields(["Payee"])
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("export.QFX"), "ofx")
+        self.assertEqual(detect_format("rows.jsonl"), "jsonl")
+        self.assertEqual(detect_format("bank.csv"), "csv")
+
+
+class TestImport(unittest.TestCase):
+
+    def test_csv_import_dedups_and_updates_balance(self):
+        account = new_account()
+        report = import_into(account, io.StringIO(CSV_EXPORT), "csv", chunk_size=2)
+        self.assertEqual(report.rows_read, 6)
+        self.assertEqual(report.rejected, 1)
+        self.assertEqual(report.duplicates, 1)  # the existing Coffee Shop row
+        self.assertEqual(report.imported, 4)  # both Refund rows: two real purchases
+        self.assertEqual(account["transactions"][1], {
+            "date": "2025-05-06", "amount": -1020.5, "description": "Bookshop", "category": UNCATEGORIZED,
+        })
+        self.assertEqual(account["balance"], 100.0 - 1020.50 - 3.00 - 3.00 + 2000.00)
+
+    def test_identical_rows_dedup_against_existing_copies_only(self):
+        account = {"balance": 0.0, "transactions": []}
+        data = "Date,Description,Amount\n2025-05-01,Coffee Shop,-3.50\n2025-05-01,Coffee Shop,-3.50\n"
+        report = import_into(account, io.StringIO(data), "csv")
+        self.assertEqual((report.imported, report.duplicates), (2, 0))
+        self.assertEqual(account["balance"], -7.0)
+        # Re-importing the same file matches each row to one existing copy
+        report = import_into(account, io.StringIO(data + "2025-05-01,Coffee Shop,-3.50\n"), "csv")
+        self.assertEqual((report.imported, report.duplicates), (1, 2))
+        self.assertEqual(len(account["transactions"]), 3)
+
+    def test_debit_credit_columns(self):
+        account = {"balance": 0.0, "transactions": []}
+        data = "Date,Payee,Debit,Credit\n2025-05-01,Shop,12.50,\n2025-05-02,Employer,,99.99\n"
+        import_into(account, io.StringIO(data), "csv")
+        self.assertEqual([t["amount"] for t in account["transactions"]], [-12.5, 99.99])
+
+    def test_jsonl_import(self):
+        account = new_account()
+        lines = "\n".join(json.dumps(t) for t in [
+            {"date": "2025-05-02", "amount": -20.0, "description": "Grocery Store", "category": "food"},
+            {"date": "2025-05-01", "amount": -50.0, "description": "Coffee Shop", "category": "food"},
+        ])
+        report = import_into(account, io.StringIO(lines), "jsonl")
+        self.assertEqual((report.imported, report.duplicates), (1, 1))
+
+    def test_jsonl_bad_lines_are_rejected(self):
+        account = {"balance": 0.0, "transactions": []}
+        lines = "\n".join([
+            "[1, 2]",
+            json.dumps({"date": "2025-05-01", "amount": -50.0, "description": "Coffee Shop", "category": "food"}),
+            '{"date": "2025-05-02", "amount":',
+            "42",
+            json.dumps({"date": "2025-05-03", "amount": 10.0, "description": "Refund", "category": "food"}),
+        ])
+        report = import_into(account, io.StringIO(lines), "jsonl")
+        self.assertEqual((report.rows_read, report.imported, report.rejected), (5, 2, 3))
+        self.assertEqual([t["description"] for t in account["transactions"]], ["Coffee Shop", "Refund"])
+
+    def test_single_line_xml_ofx(self):
+        account = {"balance": 0.0, "transactions": []}
+        data = (
+            "<OFX><BANKTRANLIST>"
+            "<STMTTRN><DTPOSTED>20250509</DTPOSTED><TRNAMT>-12.34</TRNAMT><NAME>UBER TRIP</NAME></STMTTRN>"
+            "<STMTTRN><DTPOSTED>20250510</DTPOSTED><TRNAMT>100.00</TRNAMT><NAME>ACME PAYROLL</NAME></STMTTRN>"
+            "<STMTTRN><DTPOSTED>20250511</DTPOSTED><TRNAMT>-5.00</TRNAMT><NAME>BAKERY</NAME></STMTTRN>"
+            "</BANKTRANLIST></OFX>"
+        )
+        report = import_into(account, io.StringIO(data), "ofx")
+        self.assertEqual((report.rows_read, report.imported), (3, 3))
+        self.assertEqual([t["description"] for t in account["transactions"]], ["UBER TRIP", "ACME PAYROLL", "BAKERY"])
+
+    def test_ofx_import(self):
+        account = {"balance": 0.0, "transactions": []}
+        report = import_into(account, io.StringIO(OFX_EXPORT), "ofx")
+        self.assertEqual(report.imported, 2)
+        self.assertEqual(account["transactions"][0]["date"], "2025-05-09")
+        self.assertEqual(account["transactions"][0]["description"], "UBER TRIP")
+        self.assertEqual(account["transactions"][1]["amount"], 100.0)
+
+    def test_transform_hook(self):
+        account = {"balance": 0.0, "transactions": []}
+
+        def label(chunk):
+            return [dict(t, category="bulk") for t in chunk]
+
+        import_into(account, io.StringIO(CSV_EXPORT), "csv", transform=label)
+        self.assertTrue(all(t["category"] == "bulk" for t in account["transactions"]))
+
+    def test_import_file_persists(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "export.csv")
+            account_path = os.path.join(tmpdir, "account.json")
+            with open(source, "w") as f:
+                f.write(CSV_EXPORT)
+            report = import_file(source, account_path)
+            self.assertEqual(report.imported, 5)
+            self.assertGreater(report.rows_per_sec, 0)
+            with open(account_path) as f:
+                self.assertEqual(len(json.load(f)["transactions"]), 5)
+            # Importing the same export again adds nothing
+            self.assertEqual(import_file(source, account_path).imported, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from intents import KeywordAutomaton, IntentRouter, text_after, word_after
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+
+    def test_finds_overlapping_keywords(self):
+        automaton = KeywordAutomaton(["spend", "spend on food", "food", "on f", "in "])
+        self.assertEqual(
+            automaton.find("how much did i spend on food?"),
+            {"spend", "spend on food", "food", "on f"},
+        )
+
+    def test_follows_failure_links(self):
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+        self.assertEqual(automaton.find("ushers"), {"he", "she", "hers"})
+
+    def test_no_match(self):
+        self.assertEqual(KeywordAutomaton(["balance"]).find("hello"), frozenset())
+
+
+class TestIntentRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = IntentRouter()
+        self.router.add("both", [("spent", "total")], lambda: "both")
+        self.router.add("either", ["spent", "spend"], lambda: "either")
+        self.router.add("income_from", ["income from"], lambda source: source, slots=text_after("income from", "source"))
+        self.router.add("month", [("in ", "expenses")], lambda month: month, slots=word_after("in ", "month"))
+        self.router.default(lambda: "fallback")
+
+    def test_registration_order_wins(self):
+        self.assertEqual(self.router.dispatch("total spent"), "both")
+        self.assertEqual(self.router.dispatch("what did I spend"), "either")
+
+    def test_fallback(self):
+        self.assertEqual(self.router.dispatch("hello"), "fallback")
+
+    def test_slots_keep_original_case(self):
+        self.assertEqual(self.router.dispatch("  Income from SALARY?  "), "SALARY")
+
+    def test_word_slot(self):
+        self.assertEqual(self.router.dispatch("expenses in May?"), "may")
+
+    def test_decisions_are_memoized(self):
+        first = self.router.route("total spent")
+        self.assertIn(frozenset({"spent", "total"}), self.router._decisions)
+        self.assertIs(self.router.route("spent total!"), first)
+
+    def test_adding_an_intent_recompiles(self):
+        self.router.route("hello")
+        self.router.add("greeting", ["hello"], lambda: "hi")
+        self.assertEqual(self.router.dispatch("hello"), "hi")
+
+    def test_text_slot_empty_without_phrase(self):
+        self.assertEqual(text_after(" at ", "merchant")("spent at", "Spent at"), {"merchant": ""})
+
+    def test_context_passed_only_to_handlers_that_take_it(self):
+        self.router.add("greeting", ["hello"], lambda name, session: f"hi {name}", slots={"name": "you"})
+        self.assertEqual(self.router.dispatch("hello", session={}, account=None), "hi you")
+        self.assertEqual(self.router.dispatch("what did I spend", session={}, account=None), "either")
+
+    def test_re_registering_swaps_handler_and_keeps_matcher(self):
+        self.router.route("total spent")
+        automaton = self.router._automaton
+        self.router.add("both", [("spent", "total")], lambda: "both again")
+        self.assertIs(self.router._automaton, automaton)
+        self.assertEqual(len(self.router.intents), 4)
+        self.assertEqual(self.router.dispatch("total spent"), "both again")
+
+    def test_re_registering_new_keywords_keeps_order(self):
+        self.router.add("both", ["spend"], lambda: "both again")
+        self.assertEqual([intent.name for intent in self.router.intents], ["both", "either", "income_from", "month"])
+        self.assertEqual(self.router.dispatch("what did I spend"), "both again")
+
+
+if __name__ == '__main__':
+    unittest.main()
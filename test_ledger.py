@@ -0,0 +1,137 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import ledger
+from ledger import TransactionStore, store_for, parse_day, to_cents, money, INVALID_DAY
+
+TRANSACTIONS = [
+    {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-02", "amount": -20.10, "description": "Grocery Store", "category": "food"},
+    {"date": "2025-05-03", "amount": 200.00, "description": "Salary Deposit", "category": "salary"},
+    {"date": "2025-05-05", "amount": -15.00, "description": "Bus Ticket", "category": "transport"},
+    {"date": "2025-05-06", "amount": -50.00, "description": "Dinner", "category": "food"},
+    {"date": "2025-05-10", "amount": 50.00, "description": "Project A Bonus", "category": "Salary"},
+]
+
+
+class TestTransactionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [t.copy() for t in TRANSACTIONS]
+        self.store = TransactionStore.from_transactions(self.transactions)
+
+    def test_columns(self):
+        self.assertEqual(len(self.store), 6)
+        self.assertEqual(list(self.store.cents), [-5000, -2010, 20000, -1500, -5000, 5000])
+        self.assertEqual(self.store.days[0], parse_day("2025-05-01"))
+        # Repeated strings are interned once
+        self.assertEqual(len(self.store.categories), 4)
+        self.assertEqual(self.store.category_codes[0], self.store.category_codes[1])
+
+    def test_round_trip(self):
+        self.assertEqual(self.store.to_transactions(), self.transactions)
+
+    def test_from_account(self):
+        store = TransactionStore.from_account({"balance": 0, "transactions": self.transactions})
+        self.assertEqual(list(store.cents), list(self.store.cents))
+
+    def test_totals(self):
+        self.assertEqual(self.store.total_income_cents(), 25000)
+        self.assertEqual(self.store.total_spent_cents(), 13510)
+
+    def test_category_reductions(self):
+        self.assertEqual(self.store.spending_by_category_cents("food"), 12010)
+        self.assertEqual(self.store.spending_by_category_cents("missing"), 0)
+        self.assertEqual(self.store.income_by_category_cents("SALARY"), 25000)
+        self.assertEqual(self.store.income_by_category_cents("food"), 0)
+
+    def test_largest_expense_is_first_of_ties(self):
+        self.assertEqual(self.store.largest_expense_index(), 0)
+        self.assertIsNone(TransactionStore().largest_expense_index())
+        self.assertIsNone(TransactionStore.from_transactions(self.transactions[2:3]).largest_expense_index())
+
+    def test_invalid_date(self):
+        self.assertEqual(parse_day("not-a-date"), INVALID_DAY)
+        self.assertEqual(parse_day("2025-5-1"), INVALID_DAY)
+
+    def test_to_cents_rounds(self):
+        self.assertEqual(to_cents(0.1 + 0.2), 30)
+        self.assertEqual(to_cents(-20.1), -2010)
+
+    def test_to_cents_exact_for_strings(self):
+        self.assertEqual(to_cents("1234567890123.45"), 123456789012345)
+        self.assertEqual(to_cents(Decimal("-0.015")), -2)
+        self.assertEqual(to_cents(7), 700)
+        for bad in ("abc", "NaN", "Infinity", None):
+            with self.assertRaises(ValueError):
+                to_cents(bad)
+
+    def test_money_is_exact_decimal(self):
+        cents = [to_cents(0.1)] * 10 + [to_cents(0.2)] * 10
+        self.assertEqual(money(sum(cents)), Decimal("3.00"))
+        self.assertEqual(f"{money(-5):.2f}", "-0.05")
+
+
+class TestDateIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [t.copy() for t in TRANSACTIONS]
+        self.store = TransactionStore.from_transactions(self.transactions)
+
+    def test_range_sums(self):
+        self.assertEqual(self.store.spending_between_cents(date(2025, 5, 1), date(2025, 5, 2)), 7010)
+        self.assertEqual(self.store.income_between_cents(date(2025, 5, 1), date(2025, 5, 31)), 25000)
+        self.assertEqual(self.store.spending_between_cents(date(2025, 6, 1), date(2025, 6, 30)), 0)
+        self.assertEqual(self.store.spending_between_cents(date(2025, 5, 10), date(2025, 5, 1)), 0)
+
+    def test_in_order_append_extends_index(self):
+        index = self.store.date_index
+        self.store.append({"date": "2025-05-20", "amount": -5.00, "description": "Tea", "category": "food"})
+        self.assertIs(self.store.date_index, index)
+        self.assertEqual(self.store.spending_between_cents(date(2025, 5, 20), date(2025, 5, 20)), 500)
+
+    def test_out_of_order_append_rebuilds_index(self):
+        index = self.store.date_index
+        self.store.append({"date": "2025-04-01", "amount": -7.00, "description": "Tea", "category": "food"})
+        self.assertIsNot(self.store.date_index, index)
+        self.assertEqual(self.store.spending_between_cents(date(2025, 4, 1), date(2025, 5, 1)), 5700)
+
+    def test_unparsable_dates_are_skipped(self):
+        store = TransactionStore.from_transactions(
+            self.transactions + [{"date": "someday", "amount": -9.00, "description": "?", "category": "food"}]
+        )
+        self.assertEqual(store.spending_between_cents(date(1, 1, 1), date(9999, 12, 31)), 13510)
+
+
+class TestStoreFor(unittest.TestCase):
+
+    def setUp(self):
+        ledger._stores.clear()
+
+    def test_reuses_store_for_same_list(self):
+        transactions = [t.copy() for t in TRANSACTIONS]
+        self.assertIs(store_for(transactions), store_for(transactions))
+
+    def test_picks_up_appended_rows(self):
+        transactions = [t.copy() for t in TRANSACTIONS]
+        store = store_for(transactions)
+        transactions.append({"date": "2025-05-12", "amount": -1.25, "description": "Gum", "category": "food"})
+        self.assertIs(store_for(transactions), store)
+        self.assertEqual(store.spending_by_category_cents("food"), 12135)
+
+    def test_rebuilds_when_rows_removed(self):
+        transactions = [t.copy() for t in TRANSACTIONS]
+        store_for(transactions)
+        transactions.pop(0)
+        self.assertEqual(store_for(transactions).spending_by_category_cents("food"), 7010)
+
+    def test_cache_is_bounded(self):
+        lists = [[t.copy() for t in TRANSACTIONS] for _ in range(ledger.STORE_CACHE_SIZE + 3)]
+        for transactions in lists:
+            store_for(transactions)
+        self.assertEqual(len(ledger._stores), ledger.STORE_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import unittest
+
+from intents import IntentRouter
+from metrics import Metrics, Histogram
+from cache import ResponseCache
+
+
+def make_router():
+    router = IntentRouter()
+    router.add("balance", ["balance"], lambda: "Your balance is $1.00.")
+    router.default(lambda: "Sorry.")
+    return router
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics(enabled=False)
+        with metrics.turn():
+            with metrics.span("route"):
+                pass
+            metrics.observe_intent("balance")
+        self.assertEqual(metrics.as_dict()["stage_seconds"], {})
+        self.assertEqual(metrics.recent_turns(), [])
+
+    def test_turn_breakdown(self):
+        metrics = Metrics(enabled=True)
+        with metrics.turn():
+            with metrics.span("load"):
+                pass
+            make_router().dispatch("What's my balance?", metrics=metrics)
+        turn, = metrics.recent_turns()
+        self.assertEqual(turn["intent"], "balance")
+        self.assertEqual(set(turn["stages_ms"]), {"load", "route", "answer"})
+        self.assertEqual(metrics.queries_total, {"balance": 1})
+        self.assertEqual(metrics.turn_seconds["balance"].count, 1)
+
+    def test_recent_turns_by_account(self):
+        metrics = Metrics(enabled=True)
+        for account in ("alice", "bob", "alice"):
+            with metrics.turn(account):
+                make_router().dispatch("balance", metrics=metrics)
+        self.assertEqual([turn["account"] for turn in metrics.recent_turns()], ["alice", "bob", "alice"])
+        self.assertEqual(len(metrics.recent_turns("alice")), 2)
+        self.assertEqual([turn["account"] for turn in json.loads(metrics.to_json("bob"))["recent_turns"]], ["bob"])
+
+    def test_spans_outside_turn(self):
+        metrics = Metrics(enabled=True)
+        router = make_router()
+        cache = ResponseCache()
+        for _ in range(3):
+            router.dispatch("hello", cache=cache, version=1, metrics=metrics)
+        self.assertEqual(metrics.stage_seconds["route"].count, 3)
+        self.assertEqual(metrics.queries_total, {"fallback": 3})
+        self.assertEqual(metrics.recent_turns(), [])
+
+    def test_recent_is_bounded(self):
+        metrics = Metrics(enabled=True, recent=2)
+        for _ in range(5):
+            with metrics.turn():
+                pass
+        self.assertEqual(len(metrics.recent_turns()), 2)
+
+    def test_exports(self):
+        metrics = Metrics(enabled=True)
+        with metrics.turn():
+            make_router().dispatch("balance", metrics=metrics)
+        text = metrics.to_prometheus()
+        self.assertIn('finchat_queries_total{intent="balance"} 1', text)
+        self.assertIn('finchat_stage_seconds_bucket{stage="route",le="+Inf"} 1', text)
+        self.assertIn('finchat_turn_seconds_count{intent="balance"} 1', text)
+        data = json.loads(metrics.to_json())
+        self.assertEqual(data["queries_total"], {"balance": 1})
+        self.assertEqual(data["stage_seconds"]["answer"]["count"], 1)
+
+    def test_reset(self):
+        metrics = Metrics(enabled=True)
+        with metrics.turn():
+            metrics.observe_intent("balance")
+        metrics.reset()
+        self.assertEqual(metrics.as_dict()["queries_total"], {})
+        self.assertEqual(metrics.recent_turns(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from migrate import migrate_account, migrate_file, normalize_amount
+
+
+class TestMigrate(unittest.TestCase):
+
+    def test_normalize_amount(self):
+        self.assertEqual(normalize_amount(0.1 + 0.2), 0.3)
+        self.assertEqual(normalize_amount("12.50"), 12.5)
+        self.assertEqual(normalize_amount(-20), -20.0)
+
+    def test_migrate_account(self):
+        account = {
+            "balance": 100.00000000000001,
+            "transactions": [
+                {"date": "2025-05-01", "amount": -50.0, "description": "Coffee Shop", "category": "food"},
+                {"date": "2025-05-02", "amount": "-20.005", "description": "Grocery Store", "category": "food"},
+                {"date": "2025-05-03", "amount": 30.000000000000004, "description": "Refund", "category": "income"},
+                {"date": "2025-05-04", "amount": 7, "description": "Gift", "category": "income"},
+            ],
+        }
+        changed, drift = migrate_account(account)
+        self.assertEqual(changed, 3)
+        self.assertEqual([t["amount"] for t in account["transactions"]], [-50.0, -20.0, 30.0, 7])
+        self.assertEqual(account["balance"], 100.0)
+        self.assertGreater(drift, Decimal("0.005"))
+        self.assertLess(drift, Decimal("0.0051"))
+        self.assertEqual(migrate_account(account), (0, 0))
+
+    def test_migrate_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "account.json")
+            with open(path, "w") as f:
+                json.dump({"balance": 0.1 + 0.2, "transactions": []}, f)
+            self.assertEqual(migrate_file(path, dry_run=True)[0], 1)
+            self.assertFalse(os.path.exists(path + ".bak"))
+            self.assertEqual(migrate_file(path)[0], 1)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["balance"], 0.3)
+            with open(path + ".bak") as f:
+                self.assertEqual(json.load(f)["balance"], 0.1 + 0.2)
+            with self.assertRaises(FileNotFoundError):
+                migrate_file(os.path.join(tmpdir, "missing.json"))
+
+    def test_migrate_file_backs_up_journal(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "account.json")
+            with open(path, "w") as f:
+                json.dump({"balance": 10.0, "transactions": []}, f)
+            row = {"date": "2025-05-01", "amount": 0.1 + 0.2, "description": "Refund", "category": "income"}
+            with open(path + ".journal", "w") as f:
+                f.write(json.dumps({"at": 0, "append": row}) + "\n")
+            self.assertEqual(migrate_file(path)[0], 1)
+            self.assertFalse(os.path.exists(path + ".journal"))
+            with open(path + ".bak") as f:
+                self.assertEqual(json.load(f)["transactions"], [])
+            with open(path + ".journal.bak") as f:
+                self.assertEqual(json.loads(f.readline())["append"], row)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import unittest
+
+from persistence import AccountFile
+
+DEFAULT = {
+    "balance": 500.0,
+    "transactions": [
+        {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    ],
+}
+
+NEW_ROW = {"date": "2025-05-02", "amount": -20.00, "description": "Grocery Store", "category": "food"}
+
+
+class TestAccountFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "account.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def reopen(self, **kwargs):
+        return AccountFile(self.path, DEFAULT, **kwargs).load()
+
+    def test_missing_file_uses_copy_of_default(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        account["transactions"].append(NEW_ROW)
+        self.assertEqual(len(DEFAULT["transactions"]), 1)
+        self.assertTrue(handle.save(account))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_no_write_when_unchanged(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        mtime = os.stat(self.path).st_mtime_ns
+        self.assertFalse(handle.save(account))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+        self.assertFalse(os.path.exists(handle.journal_path))
+
+    def test_appends_go_to_journal(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        account["transactions"].append(NEW_ROW)
+        account["balance"] = 480.0
+        self.assertTrue(handle.save(account))
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)["transactions"]), 1)  # snapshot untouched
+        with open(handle.journal_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        reloaded = self.reopen()
+        self.assertEqual(reloaded["transactions"], DEFAULT["transactions"] + [NEW_ROW])
+        self.assertEqual(reloaded["balance"], 480.0)
+
+    def test_replay_skips_rows_already_in_snapshot(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        account["transactions"].append(NEW_ROW)
+        handle.save(account)
+        with open(handle.journal_path) as f:
+            journal = f.read()
+        # Simulate a crash after the snapshot replaced the file but before the journal was removed
+        handle.write_snapshot(account)
+        with open(handle.journal_path, "w") as f:
+            f.write(journal)
+        self.assertEqual(len(self.reopen()["transactions"]), 2)
+
+    def test_torn_journal_line_is_ignored(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        account["transactions"].append(NEW_ROW)
+        handle.save(account)
+        with open(handle.journal_path, "a") as f:
+            f.write('{"at": 2, "app')
+        self.assertEqual(len(self.reopen()["transactions"]), 2)
+
+    def test_appends_after_torn_journal_line_survive(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        account["transactions"].append(NEW_ROW)
+        handle.save(account)
+        with open(handle.journal_path, "a") as f:
+            f.write('{"at": 2, "app')
+
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        account["transactions"].append(dict(NEW_ROW, description="Bakery"))
+        account["balance"] = 400.0
+        handle.save(account)
+
+        account = self.reopen()
+        self.assertEqual([t["description"] for t in account["transactions"]],
+                         ["Coffee Shop", "Grocery Store", "Bakery"])
+        self.assertEqual(account["balance"], 400.0)
+
+    def test_replaced_list_writes_snapshot(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        account["transactions"] = []
+        handle.save(account)
+        self.assertFalse(os.path.exists(handle.journal_path))
+        self.assertEqual(self.reopen()["transactions"], [])
+
+    def test_changed_on_disk(self):
+        handle = AccountFile(self.path, DEFAULT)
+        account = handle.load()
+        handle.save(account)
+        self.assertFalse(handle.changed_on_disk())
+        account["transactions"].append(NEW_ROW)
+        handle.save(account)
+        self.assertFalse(handle.changed_on_disk())
+        with open(handle.journal_path, "a") as f:
+            f.write(json.dumps({"balance": 1.0}) + "\n")
+        self.assertTrue(handle.changed_on_disk())
+
+    def test_compaction(self):
+        handle = AccountFile(self.path, DEFAULT, compact_every=3)
+        account = handle.load()
+        handle.save(account)
+        for _ in range(2):
+            account["transactions"].append(NEW_ROW)
+            handle.save(account)
+        self.assertEqual(handle.journal_records, 2)
+        account["transactions"].append(NEW_ROW)
+        handle.save(account)
+        self.assertEqual(handle.journal_records, 0)
+        self.assertFalse(os.path.exists(handle.journal_path))
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)["transactions"]), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from ledger import TransactionStore
+from search import DescriptionIndex, tokenize, query_terms, within_distance
+
+TRANSACTIONS = [
+    {"date": "2025-05-01", "amount": -50.00, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-02", "amount": -20.00, "description": "Grocery Store", "category": "food"},
+    {"date": "2025-05-03", "amount": -4.50, "description": "Coffee Shop", "category": "food"},
+    {"date": "2025-05-04", "amount": -12.00, "description": "UBER *TRIP 1234", "category": "transport"},
+    {"date": "2025-05-05", "amount": 3.00, "description": "Coffee Shop refund", "category": "food"},
+    {"date": "2025-05-06", "amount": -30.00, "description": "Coffee Beans Online", "category": "food"},
+]
+
+
+def brute_force(query_words):
+    rows = [t for t in TRANSACTIONS if all(w in tokenize(t["description"]) for w in query_words)]
+    income = sum(round(t["amount"] * 100) for t in rows if t["amount"] > 0)
+    spend = sum(round(-t["amount"] * 100) for t in rows if t["amount"] < 0)
+    return income, spend, len(rows), sum(1 for t in rows if t["amount"] < 0)
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("UBER *TRIP 1234"), ["uber", "trip", "1234"])
+        self.assertEqual(query_terms("the Coffee shop"), ["coffee", "shop"])
+        self.assertEqual(query_terms("the"), ["the"])
+
+    def test_within_distance(self):
+        self.assertTrue(within_distance("coffe", "coffee", 1))
+        self.assertTrue(within_distance("uebr", "uber", 1))
+        self.assertTrue(within_distance("grocry", "grocery", 1))
+        self.assertFalse(within_distance("cafe", "coffee", 2))
+        self.assertFalse(within_distance("shop", "shopping", 2))
+
+
+class TestDescriptionIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.store = TransactionStore.from_transactions(TRANSACTIONS)
+        self.index = self.store.search
+
+    def names(self, query):
+        return sorted(self.store.descriptions.values[code] for code in self.index.match(query))
+
+    def test_exact_and_intersection(self):
+        self.assertEqual(self.names("coffee shop"), ["Coffee Shop", "Coffee Shop refund"])
+        self.assertEqual(self.names("Coffee"), ["Coffee Beans Online", "Coffee Shop", "Coffee Shop refund"])
+        self.assertEqual(self.names("coffee grocery"), [])
+        self.assertEqual(self.names(""), [])
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual(self.names("gro"), ["Grocery Store"])
+        self.assertEqual(self.names("Ubr"), [])  # too short for fuzzy matching
+        self.assertEqual(self.names("uebr trip"), ["UBER *TRIP 1234"])
+        self.assertEqual(self.names("groccery"), ["Grocery Store"])
+
+    def test_totals_match_brute_force(self):
+        for query, words in [("coffee", ["coffee"]), ("coffee shop", ["coffee", "shop"]), ("uber", ["uber"]),
+                             ("refund", ["refund"]), ("nothing", ["nothing"])]:
+            self.assertEqual(self.index.totals_for(query), brute_force(words), query)
+
+    def test_updated_on_append_and_remove(self):
+        self.store.append({"date": "2025-05-07", "amount": -8.00, "description": "Uber Eats", "category": "food"})
+        self.assertEqual(self.index.totals_for("uber"), (0, 2000, 2, 2))
+        self.assertEqual(self.index.totals_for("eats"), (0, 800, 1, 1))
+        self.store.remove(3)
+        self.assertEqual(self.index.totals_for("uber"), (0, 800, 1, 1))
+        self.assertEqual(list(self.index.serials_for(self.index.match("uber eats"))), [6])
+
+    def test_standalone_index(self):
+        index = DescriptionIndex()
+        index.add(0, 0, "Bus Ticket", -150)
+        index.add(1, 0, "Bus Ticket", -150)
+        index.add(2, 1, "Train", -900)
+        self.assertEqual(index.totals_for("tick"), (0, 300, 2, 2))
+        self.assertEqual(index.match("bus train"), set())
+
+
+if __name__ == '__main__':
+    unittest.main()